@@ -0,0 +1,145 @@
+import argparse
+import subprocess
+import sys
+import time
+import numpy as np
+
+# --- BANCS D'ESSAI & BUDGETS ---
+# Vérifications de performance exécutables à la main ou en CI :
+#   python anamnesis_bench.py imports   -> budget de démarrage à froid
+#   python anamnesis_bench.py phases    -> boucle par agent vs passe vectorisée
+#   python anamnesis_bench.py checkpoint -> reprise identique bit à bit
+# Code de sortie non nul si un budget est dépassé.
+
+ENGINE_MODULES = ['anamnesis_core', 'anamnesis_record', 'anamnesis_branch', 'anamnesis_topology',
+                  'anamnesis_ensemble', 'anamnesis_calibrate', 'anamnesis_lut', 'anamnesis_live',
+                  'anamnesis_checkpoint', 'anamnesis_hierarchy']
+PLOTTING_MODULES = ['matplotlib', 'plotly', 'streamlit']
+
+_IMPORT_PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import numpy
+t1 = time.perf_counter()
+import {module}
+t2 = time.perf_counter()
+loaded = [m for m in {forbidden!r} if m in sys.modules]
+print(t1 - t0, t2 - t1, ','.join(loaded))
+"""
+
+def import_cost(module, repeat=5):
+    """Temps d'import à froid (interpréteur neuf), NumPy exclu ; meilleur de `repeat`."""
+    best, loaded = float('inf'), ''
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _IMPORT_PROBE.format(module=module, forbidden=PLOTTING_MODULES)],
+                             capture_output=True, text=True, check=True).stdout.split(' ')
+        best = min(best, float(out[1]))
+        loaded = out[2].strip()
+    return best, loaded
+
+def check_imports(budget_ms=50.0):
+    ok = True
+    for module in ENGINE_MODULES:
+        cost, loaded = import_cost(module)
+        status = '✅' if cost * 1000 <= budget_ms and not loaded else '❌'
+        ok &= status == '✅'
+        print(f"{status} {module:<22} {cost * 1000:7.1f} ms" + (f"  (charge {loaded})" if loaded else ''))
+    return ok
+
+def _scalar_dynamics(theta, stress, Tc, alpha, tau, dt):
+    # Version d'origine (branche Python), référence du banc
+    decay = -theta / tau
+    plasticity = alpha * (1.0 if stress > Tc else 0.0) * (stress - Tc)
+    return theta + (decay + plasticity) * dt
+
+def _loop_phase_state(freq, states, stress, Tc, alpha, frame, tau, dt):
+    n = len(states)
+    phases, new_states = np.zeros(n), np.zeros(n)
+    for i in range(n): phases[i] = (np.sin(frame * freq[i]) + 1) / 2
+    for i in range(n): new_states[i] = _scalar_dynamics(states[i], stress[i], Tc[i], alpha[i], tau, dt)
+    return phases, new_states
+
+def check_phases(num_agents=10000, archetypes=4, frames=20, seed=0):
+    """Phases + états sur `frames` ticks : boucle d'origine vs passe vectorisée (égalité exacte)."""
+    from anamnesis_core import PARAMS, internal_dynamics, oscillator_phases
+    rng = np.random.default_rng(seed)
+    templates = PARAMS['agents'][:archetypes] if archetypes <= len(PARAMS['agents']) else \
+        [{'Tc': rng.uniform(0.5, 5), 'alpha': rng.uniform(0, 1.3), 'freq': rng.uniform(0.01, 0.2)} for _ in range(archetypes)]
+    kinds = np.arange(num_agents) % len(templates)
+    freq, Tc, alpha = (np.array([templates[k][key] for k in kinds], dtype=float) for key in ('freq', 'Tc', 'alpha'))
+    states, tau, dt = rng.uniform(0, 3, num_agents), PARAMS['tau_decay'], PARAMS['dt']
+
+    timings, exact = {'boucle': 0.0, 'vectorisé': 0.0}, True
+    for frame in range(frames):
+        stress = rng.normal(1.0, 1.5, num_agents)
+        t0 = time.perf_counter()
+        ref = _loop_phase_state(freq, states, stress, Tc, alpha, frame, tau, dt)
+        t1 = time.perf_counter()
+        out = oscillator_phases(freq, frame), internal_dynamics(states, stress, Tc, alpha, tau, dt)
+        t2 = time.perf_counter()
+        timings['boucle'] += t1 - t0; timings['vectorisé'] += t2 - t1
+        exact &= all(np.array_equal(a, b) for a, b in zip(ref, out))
+        states = out[1]
+    for name, total in timings.items():
+        print(f"{name:>10} : {total / frames * 1000:8.3f} ms/tick")
+    print(f"{'gain':>10} : x{timings['boucle'] / timings['vectorisé']:.0f}  ({num_agents} agents, {archetypes} fréquences)")
+    print(('✅' if exact else '❌') + " résultats identiques bit à bit")
+    return exact
+
+def check_checkpoint(steps=1000, every=100, resume_at=500, seed=7):
+    """Run continu vs reprise depuis le checkpoint de `resume_at` : égalité exacte attendue."""
+    import os
+    import tempfile
+    from anamnesis_checkpoint import Checkpointer, resume
+    from anamnesis_core import new_world, periodic_stress, step_world
+    fd, path = tempfile.mkstemp(suffix='.ck')
+    os.close(fd)
+    os.remove(path) # Checkpointer crée le fichier
+    try:
+        world, history = new_world(seed=seed), []
+        n = len(world['states'])
+        t_save, saves, middle = 0.0, 0, None
+        with Checkpointer(path, n) as checkpointer:
+            while world['frame'] < steps:
+                world = step_world(world, periodic_stress(world['frame'], n))
+                history = (history + [world['divs']])[-checkpointer.history:]
+                if world['frame'] % every == 0:
+                    t0 = time.perf_counter()
+                    checkpointer.save(world, history, history)
+                    t_save += time.perf_counter() - t0; saves += 1
+                if world['frame'] == resume_at: middle = resume(path)
+        resumed, resumed_history, _ = middle
+        while resumed['frame'] < steps:
+            resumed = step_world(resumed, periodic_stress(resumed['frame'], n))
+            resumed_history = (resumed_history + [resumed['divs']])[-len(history):]
+    finally:
+        os.remove(path)
+
+    exact = all(np.array_equal(world[k], resumed[k]) for k in ('positions', 'velocities', 'states', 'phases', 'memory', 'divs', 'taus'))
+    exact &= len(history) == len(resumed_history) and all(np.array_equal(a, b) for a, b in zip(history, resumed_history))
+    exact &= world['rng'].normal() == resumed['rng'].normal()
+    print(f"{'sauvegarde':>10} : {t_save / saves * 1000:8.3f} ms ({saves} points, {n} agents)")
+    print(('✅' if exact else '❌') + f" reprise à la frame {resume_at} identique bit à bit après {steps} ticks")
+    return exact
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ANAMNESIS - bancs d'essai et budgets de performance")
+    sub = parser.add_subparsers(dest='command', required=True)
+    imports = sub.add_parser('imports', help="budget d'import à froid du moteur (NumPy seul)")
+    imports.add_argument('--budget-ms', type=float, default=50.0)
+    phases = sub.add_parser('phases', help="mise à jour phases/états : boucle vs vectorisé")
+    phases.add_argument('--agents', type=int, default=10000)
+    phases.add_argument('--archetypes', type=int, default=4, help="nombre de fréquences distinctes")
+    phases.add_argument('--frames', type=int, default=20)
+    checkpoint = sub.add_parser('checkpoint', help="reprise depuis un checkpoint vs run continu")
+    checkpoint.add_argument('--steps', type=int, default=1000)
+    checkpoint.add_argument('--every', type=int, default=100, help="période des sauvegardes (ticks)")
+    checkpoint.add_argument('--resume-at', type=int, default=500, help="frame du point de reprise")
+    args = parser.parse_args()
+
+    if args.command == 'imports':
+        sys.exit(0 if check_imports(args.budget_ms) else 1)
+    elif args.command == 'phases':
+        sys.exit(0 if check_phases(args.agents, args.archetypes, args.frames) else 1)
+    elif args.command == 'checkpoint':
+        sys.exit(0 if check_checkpoint(args.steps, args.every, args.resume_at) else 1)
@@ -0,0 +1,60 @@
+import numpy as np
+from anamnesis_core import step_world
+
+# --- INSTANTANÉS & BRANCHES "WHAT-IF" ---
+# Le moteur ne modifie jamais un tableau du monde sur place (step_world
+# renvoie de nouveaux tableaux). Un instantané se contente donc de garder
+# les références courantes (partage structurel, O(1)) et de les verrouiller
+# en lecture seule : toute modification passe par un nouveau tableau
+# (copie sur écriture). Seul l'état du générateur aléatoire est copié,
+# et sa taille ne dépend pas du nombre d'agents.
+
+FROZEN_KEYS = ('positions', 'velocities', 'states', 'phases', 'memory', 'divs', 'taus',
+               'Tc', 'alpha', 'freq', 'rest')
+
+def snapshot(world):
+    """Capture l'état complet du monde, RNG compris, sans copier les tableaux."""
+    for key in FROZEN_KEYS: world[key].setflags(write=False)
+    return dict(world, rng=world['rng'].bit_generator.state)
+
+def fork(snap, **changes):
+    """
+    Ouvre une branche depuis un instantané. Les tableaux restent partagés
+    avec l'instantané ; `changes` remplace des entrées du monde (ex.
+    memory=snap['memory'] * 0.5) sans toucher aux autres branches.
+    Chaque branche repart du même état RNG : à événements égaux, les
+    branches sont identiques, et les écarts viennent des seuls événements.
+    """
+    bit_generator = getattr(np.random, snap['rng']['bit_generator'])()
+    bit_generator.state = snap['rng']
+    world = dict(snap, rng=np.random.Generator(bit_generator))
+    world.update(changes)
+    return world
+
+def trauma(world, agent, intensity):
+    """Vecteur de stress externe ciblant un agent (ex. trahison du joueur)."""
+    stress = np.zeros(len(world['states']))
+    stress[agent] = intensity
+    return stress
+
+def run(world, steps, events=None):
+    """Avance une branche de `steps` pas. events : {frame: stress externe}."""
+    events = events or {}
+    for _ in range(steps):
+        world = step_world(world, events.get(world['frame']))
+    return world
+
+def run_branches(snap, scenarios, steps, executor=None):
+    """
+    Fait tourner plusieurs branches en parallèle depuis le même instantané.
+    scenarios : {nom: events}. Renvoie {nom: monde final}.
+    Par défaut un pool de threads (l'instantané est partagé en mémoire) ;
+    un ProcessPoolExecutor peut être fourni pour les gros mondes.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    pool = executor or ThreadPoolExecutor()
+    try:
+        futures = {name: pool.submit(run, fork(snap), steps, events) for name, events in scenarios.items()}
+        return {name: future.result() for name, future in futures.items()}
+    finally:
+        if executor is None: pool.shutdown()
@@ -0,0 +1,171 @@
+import argparse
+import numpy as np
+from anamnesis_core import PARAMS, new_world, step_world, periodic_stress
+from anamnesis_record import TrajectoryReader
+
+# --- CALIBRATION DES PARAMÈTRES ---
+# Ajuste PARAMS (eta, tau_min, tau_max, gamma, kappa, mu) et les Tc/alpha
+# de chaque agent sur une trajectoire observée (format anamnesis_record).
+#   - Optimiseur sans gradient : CMA-ES, lambda candidats par itération.
+#   - Évaluation par lots : toute la population avance bloc par bloc, en
+#     parallèle, sur le même bloc de données ; un seul bloc est en mémoire.
+#   - Chaque bloc repart de l'état observé (tir multiple) : le bruit ne
+#     s'accumule pas d'un bloc à l'autre.
+#   - Arrêt précoce : la perte partielle ne fait que croître ; un candidat
+#     qui dépasse déjà kill_factor x la perte du mu-ième meilleur de
+#     l'itération précédente est abandonné (en gardant au moins mu parents).
+
+GLOBAL_BOUNDS = {
+    'eta':     (0.0, 1.0),
+    'tau_min': (10.0, 500.0),
+    'tau_max': (500.0, 5000.0),
+    'gamma':   (0.5, 5.0),
+    'kappa':   (0.0, 2.0),
+    'mu':      (0.5, 20.0),
+}
+AGENT_BOUNDS = {
+    'Tc':    (0.1, 6.0),
+    'alpha': (0.0, 2.0),
+}
+
+def _bounds(num_agents):
+    bounds = list(GLOBAL_BOUNDS.values()) + [AGENT_BOUNDS[key] for _ in range(num_agents) for key in AGENT_BOUNDS]
+    return np.array(bounds).T
+
+def encode(params, agents):
+    low, high = _bounds(len(agents))
+    values = [params[key] for key in GLOBAL_BOUNDS] + [a[key] for a in agents for key in AGENT_BOUNDS]
+    return (np.array(values) - low) / (high - low)
+
+def decode(u, params, agents):
+    """Vecteur normalisé [0,1]^d -> (params, agents) ; hors bornes = bornes."""
+    low, high = _bounds(len(agents))
+    values = low + np.clip(u, 0.0, 1.0) * (high - low)
+    params = dict(params, **dict(zip(GLOBAL_BOUNDS, values)))
+    per_agent = values[len(GLOBAL_BOUNDS):].reshape(len(agents), len(AGENT_BOUNDS))
+    agents = [dict(a, **dict(zip(AGENT_BOUNDS, row))) for a, row in zip(agents, per_agent)]
+    return params, agents
+
+class CMAES:
+    """CMA-ES (mu/mu_w, lambda) standard, interface ask/tell."""
+    def __init__(self, x0, sigma, popsize=None, seed=None):
+        n = len(x0)
+        self.mean, self.sigma = np.array(x0, dtype=float), sigma
+        self.popsize = popsize or 4 + int(3 * np.log(n))
+        self.mu = self.popsize // 2
+        w = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = w / w.sum()
+        self.mueff = 1.0 / np.sum(self.weights ** 2)
+
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0, np.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+        self.pc, self.ps = np.zeros(n), np.zeros(n)
+        self.C = np.eye(n)
+        self.generation = 0
+        self.rng = np.random.default_rng(seed)
+
+    def ask(self):
+        eigvals, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigvals, 1e-20))
+        z = self.rng.standard_normal((self.popsize, len(self.mean)))
+        return self.mean + self.sigma * (z * self.D) @ self.B.T
+
+    def tell(self, xs, losses):
+        n = len(self.mean)
+        order = np.argsort(losses)[:self.mu]
+        y = (xs[order] - self.mean) / self.sigma
+        y_w = self.weights @ y
+        self.mean = self.mean + self.sigma * y_w
+
+        inv_sqrt_C = self.B @ np.diag(1 / self.D) @ self.B.T
+        self.ps = (1 - self.cs) * self.ps + np.sqrt(self.cs * (2 - self.cs) * self.mueff) * inv_sqrt_C @ y_w
+        self.generation += 1
+        h_sig = np.linalg.norm(self.ps) / np.sqrt(1 - (1 - self.cs) ** (2 * self.generation)) / self.chi_n < 1.4 + 2 / (n + 1)
+        self.pc = (1 - self.cc) * self.pc + h_sig * np.sqrt(self.cc * (2 - self.cc) * self.mueff) * y_w
+
+        rank_mu = (y.T * self.weights) @ y
+        self.C = ((1 - self.c1 - self.cmu) * self.C
+                  + self.c1 * (np.outer(self.pc, self.pc) + (1 - h_sig) * self.cc * (2 - self.cc) * self.C)
+                  + self.cmu * rank_mu)
+        self.sigma *= np.exp((self.cs / self.damps) * (np.linalg.norm(self.ps) / self.chi_n - 1))
+
+def chunk_loss(world, chunk, drive):
+    """
+    Recale le monde sur la 1re frame observée du bloc, simule la suite
+    du bloc et renvoie (monde, erreur quadratique sur états et mémoire).
+    """
+    world = dict(world, frame=int(chunk['frame'][0]) + 1, positions=chunk['positions'][0],
+                 states=chunk['states'][0], memory=chunk['memory'][0])
+    n, loss = len(world['states']), 0.0
+    for k in range(1, len(chunk['frame'])):
+        world = step_world(world, drive(world['frame'], n))
+        loss += np.mean((world['states'] - chunk['states'][k]) ** 2) + np.mean((world['memory'] - chunk['memory'][k]) ** 2)
+    return world, loss
+
+def _evaluate(args):
+    candidate, world, chunk, drive, seed = args
+    if world is None: world = new_world(candidate[1], candidate[0], seed=seed)
+    return chunk_loss(world, chunk, drive)
+
+def calibrate(path, params=PARAMS, agents=None, drive=periodic_stress, iterations=30,
+              popsize=None, sigma=0.2, kill_factor=2.0, max_workers=None, seed=0, verbose=True):
+    """
+    Calibre les paramètres sur la trajectoire `path`. Les candidats d'une
+    même itération partagent la graine du bruit (comparaison à bruit égal).
+    Renvoie (params, agents, perte).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    agents = params['agents'] if agents is None else agents
+    es = CMAES(encode(params, agents), sigma, popsize, seed)
+    best = (params, agents, np.inf)
+    threshold = np.inf
+
+    with TrajectoryReader(path) as reader, ProcessPoolExecutor(max_workers) as pool:
+        for iteration in range(iterations):
+            xs = es.ask()
+            candidates = [decode(x, params, agents) for x in xs]
+            worlds = [None] * len(xs)
+            losses = np.zeros(len(xs))
+            alive = np.ones(len(xs), dtype=bool)
+
+            for chunk in reader.iter_chunks():
+                idx = np.flatnonzero(alive)
+                jobs = [(candidates[k], worlds[k], chunk, drive, seed + iteration) for k in idx]
+                for k, (world, loss) in zip(idx, pool.map(_evaluate, jobs)):
+                    worlds[k] = world
+                    losses[k] += loss
+                survivors = alive & (losses <= threshold)
+                if survivors.sum() < es.mu:
+                    # Toujours garder assez de parents : les mu meilleurs partiels
+                    survivors = alive & (losses <= np.sort(losses[alive])[min(es.mu, alive.sum()) - 1])
+                alive = survivors
+
+            losses[~alive] = np.inf
+            es.tell(xs, losses)
+            ranked = np.sort(losses)
+            if np.isfinite(ranked[es.mu - 1]): threshold = kill_factor * ranked[es.mu - 1]
+            k = int(np.argmin(losses))
+            if losses[k] < best[2]: best = candidates[k] + (float(losses[k]),)
+            if verbose:
+                print(f"Itération {iteration:3d} | meilleure perte {best[2]:.6f} | abandonnés {np.sum(~alive)}/{len(xs)}")
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ANAMNESIS - calibration des paramètres sur données enregistrées")
+    parser.add_argument('path', help="trajectoire observée (anamnesis_record)")
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--popsize', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--kill-factor', type=float, default=2.0)
+    args = parser.parse_args()
+
+    params, agents, loss = calibrate(args.path, iterations=args.iterations, popsize=args.popsize,
+                                     kill_factor=args.kill_factor, max_workers=args.workers)
+    print(f"\n✅ Perte finale : {loss:.6f}")
+    for key in GLOBAL_BOUNDS: print(f"{key:>10} : {params[key]:.4f}")
+    for a in agents: print(f"{a['name']:>22} : Tc={a['Tc']:.3f} alpha={a['alpha']:.3f}")
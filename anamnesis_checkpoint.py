@@ -0,0 +1,134 @@
+import json
+import os
+import numpy as np
+
+# --- POINTS DE REPRISE (CHECKPOINTS) ---
+# Un fichier mappé en mémoire (np.memmap) contient deux emplacements A/B de
+# taille fixe. Chaque sauvegarde écrit dans l'emplacement inactif, le
+# synchronise sur disque, puis seulement bascule l'index actif de l'en-tête :
+# un crash en cours d'écriture laisse intact le dernier point valide.
+#   [en-tête : MAGIC, version, n, historique, capacité méta, actif, générations]
+#   [emplacement A][emplacement B]   (alignés sur 4 Kio)
+# Emplacement : tableaux du monde, historiques div/tau, puis méta JSON
+# (frame, état RNG, paramètres, agents).
+# La mémoire (n x n) est réécrite en entier à chaque sauvegarde : chaque lien
+# non nul décroît à chaque tick, donc aucune ligne ne reste inchangée.
+# Seul `rest` (figé à la création du monde, jamais modifié sur place) est
+# sauté quand l'emplacement contient déjà ce même tableau (identité).
+
+MAGIC = b'ANCK'
+VERSION = 1
+PAGE = 4096
+HEADER_FIELDS = ('version', 'num_agents', 'history', 'meta_capacity', 'active', 'gen_a', 'gen_b')
+WORLD_KEYS = ('positions', 'velocities', 'states', 'phases', 'memory', 'divs', 'taus',
+              'Tc', 'alpha', 'freq', 'rest')
+
+def _slot_layout(num_agents, history, meta_capacity):
+    n = num_agents
+    shapes = {'positions': (n, 3), 'velocities': (n, 3), 'memory': (n, n), 'rest': (n, n),
+              'div_history': (history, n), 'tau_history': (history, n), 'history_len': (1,)}
+    layout, offset = {}, 0
+    for key in WORLD_KEYS + ('div_history', 'tau_history', 'history_len'):
+        shape = shapes.get(key, (n,))
+        layout[key] = (offset, shape)
+        offset += int(np.prod(shape)) * 8
+    layout['meta'] = (offset, (meta_capacity,))
+    size = offset + meta_capacity
+    return layout, -(-size // PAGE) * PAGE
+
+class Checkpointer:
+    """
+    Points de reprise d'un monde de `num_agents` agents dans `path`.
+    Le fichier est créé s'il n'existe pas ; sinon ses dimensions sont relues.
+    """
+    def __init__(self, path, num_agents=None, history=200, meta_capacity=None):
+        self.path = path
+        if not os.path.exists(path):
+            if num_agents is None: raise ValueError(f"{path} n'existe pas : num_agents requis")
+            self._create(path, num_agents, history, meta_capacity or 65536 + 256 * num_agents)
+        with open(path, 'rb') as f:
+            if f.read(4) != MAGIC: raise ValueError(f"{path} n'est pas un checkpoint ANAMNESIS")
+            header = dict(zip(HEADER_FIELDS, np.frombuffer(f.read(8 * len(HEADER_FIELDS)), dtype=np.uint64).tolist()))
+        if header['version'] != VERSION: raise ValueError(f"Version de checkpoint non supportée : {header['version']}")
+        if num_agents is not None and header['num_agents'] != num_agents:
+            raise ValueError(f"{path} : {header['num_agents']} agents, {num_agents} attendus")
+        self.num_agents, self.history = header['num_agents'], header['history']
+
+        layout, slot_size = _slot_layout(self.num_agents, self.history, header['meta_capacity'])
+        self._mm = np.memmap(path, dtype=np.uint8, mode='r+')
+        self._header = np.ndarray((len(HEADER_FIELDS),), dtype=np.uint64, buffer=self._mm, offset=4)
+        self._slots = []
+        for k in range(2):
+            base = PAGE + k * slot_size
+            slot = {key: np.ndarray(shape, dtype=np.uint8 if key == 'meta' else np.float64,
+                                    buffer=self._mm, offset=base + offset)
+                    for key, (offset, shape) in layout.items()}
+            self._slots.append(slot)
+        self._rest = [None, None] # Tableau `rest` déjà écrit dans chaque emplacement
+
+    @staticmethod
+    def _create(path, num_agents, history, meta_capacity):
+        _, slot_size = _slot_layout(num_agents, history, meta_capacity)
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(np.array([VERSION, num_agents, history, meta_capacity, 0, 0, 0], dtype=np.uint64).tobytes())
+            f.truncate(PAGE + 2 * slot_size)
+
+    @property
+    def generation(self):
+        """Nombre de sauvegardes validées (0 = aucun point de reprise)."""
+        return int(max(self._header[5], self._header[6]))
+
+    def save(self, world, diversity_history=(), tau_history=()):
+        """Sauvegarde atomique du monde (+ historiques)."""
+        slot = 1 - int(self._header[4]) if self.generation else 0
+        views = self._slots[slot]
+        meta = json.dumps({'frame': world['frame'], 'rng': world['rng'].bit_generator.state,
+                           'params': world['params'], 'agents': world['agents']}).encode()
+        if len(meta) + 4 > len(views['meta']): raise ValueError(f"Méta trop volumineuse ({len(meta)} octets)")
+
+        for key in WORLD_KEYS:
+            if key == 'rest' and self._rest[slot] is world['rest']: continue
+            views[key][...] = world[key]
+        self._rest[slot] = world['rest']
+        divs, taus = list(diversity_history)[-self.history:], list(tau_history)[-self.history:]
+        if divs: views['div_history'][:len(divs)], views['tau_history'][:len(taus)] = divs, taus
+        views['history_len'][0] = len(divs)
+        views['meta'][:4] = np.frombuffer(np.uint32(len(meta)).tobytes(), dtype=np.uint8)
+        views['meta'][4:4 + len(meta)] = np.frombuffer(meta, dtype=np.uint8)
+        self._mm.flush() # Emplacement sur disque avant la bascule
+
+        self._header[5 + slot] = self.generation + 1
+        self._header[4] = slot
+        self._mm.flush()
+
+    def load(self):
+        """Dernier point valide : (world, diversity_history, tau_history), tableaux copiés."""
+        if not self.generation: raise ValueError(f"{self.path} : aucun point de reprise")
+        views = self._slots[int(self._header[4])]
+        size = int(np.frombuffer(views['meta'][:4].tobytes(), dtype=np.uint32)[0])
+        meta = json.loads(views['meta'][4:4 + size].tobytes())
+
+        bit_generator = getattr(np.random, meta['rng']['bit_generator'])()
+        bit_generator.state = meta['rng']
+        world = {key: np.array(views[key]) for key in WORLD_KEYS}
+        world['rest'].setflags(write=False)
+        world.update(frame=meta['frame'], params=meta['params'], agents=meta['agents'],
+                     rng=np.random.Generator(bit_generator))
+        length = int(views['history_len'][0])
+        return world, list(np.array(views['div_history'][:length])), list(np.array(views['tau_history'][:length]))
+
+    def close(self):
+        self._mm.flush()
+        del self._header, self._slots, self._mm
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def resume(path):
+    """Reprise directe depuis un fichier de checkpoint."""
+    with Checkpointer(path) as checkpointer:
+        return checkpointer.load()
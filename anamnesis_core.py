@@ -1,8 +1,8 @@
+from functools import lru_cache
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from matplotlib.animation import FuncAnimation
-from collections import deque
+
+# Le moteur ne dépend que de NumPy : matplotlib n'est importé qu'au premier
+# rendu (setup_figure), pour que les workers démarrent vite.
 
 # --- IDENTITÉ DU PROJET ---
 # Titre : ANAMNESIS
@@ -18,10 +18,20 @@ POSITIONS_INIT = np.array([
 ]) * 1.8
 
 num_agents = 4
-REST_DISTANCES = np.zeros((num_agents, num_agents))
-for i in range(num_agents):
-    for j in range(num_agents):
-        REST_DISTANCES[i,j] = np.linalg.norm(POSITIONS_INIT[i] - POSITIONS_INIT[j])
+
+@lru_cache(maxsize=32)
+def _rest_distances(key, n):
+    pos = np.frombuffer(key).reshape(n, 3)
+    rest = np.sqrt(np.sum((pos[:, None] - pos[None, :]) ** 2, axis=-1))
+    rest.setflags(write=False)
+    return rest
+
+def rest_distances(positions):
+    """Distances de repos, calculées une fois par configuration initiale."""
+    positions = np.ascontiguousarray(positions, dtype=float)
+    return _rest_distances(positions.tobytes(), len(positions))
+
+REST_DISTANCES = rest_distances(POSITIONS_INIT)
 
 PARAMS = {
     'steps': 10000,
@@ -33,6 +43,7 @@ PARAMS = {
     'tau_min': 100.0,  # Oubli rapide (Obsession)
     'tau_max': 2000.0, # Consolidation
     'gamma': 2.5,      # Sévérité entropique
+    'tau_refresh': 1,  # Recalcul de la diversité tous les N ticks (1 = production)
     
     # Physique (Tensegrités)
     'lambda_c': 1.2,   # Attraction Mémorielle
@@ -40,9 +51,13 @@ PARAMS = {
     'mu': 5.0,         # Barrière de Répulsion (Durcie pour stabilité)
     'friction': 0.15,
     
+    # Bruit Ambiant (stress de fond)
+    'noise_mean': 0.1,
+    'noise_std': 0.05,
+    
     'agents': [
         # GROK : Le Squelette froid et critique (Seuil Tc très haut, change peu)
-        'name': 'Grok (Machine)', 'Tc': 5.0, 'alpha': 0.1, 'freq': 0.05, 'c': '#00ffff'}, # Cyan
+        {'name': 'Grok (Machine)', 'Tc': 5.0, 'alpha': 0.1, 'freq': 0.05, 'c': '#00ffff'}, # Cyan
         
         # CLAUDE : La Conscience philosophique (Sensible à la nuance)
         {'name': 'Claude (Conscience)', 'Tc': 1.0, 'alpha': 0.7, 'freq': 0.08, 'c': '#ffaa00'}, # Or
@@ -55,140 +70,252 @@ PARAMS = {
     ]
 }
 
-# --- ÉTAT ---
-positions = POSITIONS_INIT.copy()
-velocities = np.zeros_like(positions)
-states = np.zeros(num_agents)
-phases = np.zeros(num_agents)
-memory_matrix = np.zeros((num_agents, num_agents)) # Asymétrique
-diversity_history = [np.ones(num_agents)]
-tau_history = [np.ones(num_agents) * PARAMS['tau_max']]
+# Fidélité : même moteur, réglages différents. L'aperçu (démos interactives)
+# ne recalcule la diversité/tau que tous les 10 ticks : ce sont des lois lentes.
+# Gain marginal (~5 %) : l'essentiel du coût est la passe N² géométrie/mémoire,
+# identique dans les deux modes.
+FIDELITY = {
+    'full':    {'tau_refresh': 1},
+    'preview': {'tau_refresh': 10},
+}
+
+def with_fidelity(params, mode):
+    return dict(params, **FIDELITY[mode])
+
+# Équipe de jeu (RPG) : la distribution utilisée par les démos Streamlit
+PARTY_AGENTS = [
+    {'name': 'Warrior', 'Tc': 4.0, 'alpha': 0.0, 'freq': 0.05, 'c': '#00ffff'},
+    {'name': 'Diplomat', 'Tc': 0.8, 'alpha': 0.6, 'freq': 0.08, 'c': '#ffaa00'},
+    {'name': 'Scout', 'Tc': 1.5, 'alpha': 0.8, 'freq': 0.11, 'c': '#55ff55'},
+    {'name': 'Leader', 'Tc': 0.5, 'alpha': 1.2, 'freq': 0.14, 'c': '#ff00ff'}
+]
+PARTY_PARAMS = dict(PARAMS, steps=300, noise_mean=0.01, noise_std=0.005, agents=PARTY_AGENTS)
 
 # --- MOTEUR ---
 def calculate_entropy(resonances):
-    total_r = np.sum(resonances)
-    if total_r < 1e-6: return 1.0
-    probs = resonances / total_r
-    probs = probs[probs > 0]
-    if len(probs) <= 1: return 0.0
-    entropy = -np.sum(probs * np.log(probs))
-    max_entropy = np.log(len(resonances))
-    return entropy / max_entropy
+    """Diversité normalisée de chaque ligne de résonances (0 = obsession, 1 = ouverture)."""
+    total_r = np.sum(resonances, axis=-1, keepdims=True)
+    silent = total_r[..., 0] < 1e-6
+    probs = resonances / np.where(silent[..., None], 1.0, total_r)
+    plogp = np.where(probs > 0, probs * np.log(np.where(probs > 0, probs, 1.0)), 0.0)
+    entropy = -np.sum(plogp, axis=-1) / np.log(resonances.shape[-1])
+    single = np.sum(probs > 0, axis=-1) <= 1
+    return np.where(silent, 1.0, np.where(single, 0.0, entropy))
 
 def internal_dynamics(theta, stress, Tc, alpha, tau, dt):
+    """Scalaire ou vectoriel : le masque booléen vaut 1.0/0.0, comme la branche scalaire."""
     decay = -theta / tau
-    plasticity = alpha * (1.0 if stress > Tc else 0.0) * (stress - Tc)
+    plasticity = alpha * np.greater(stress, Tc) * (stress - Tc)
     return theta + (decay + plasticity) * dt
 
-def update_geometry_and_memory(pos, vel, states, phases, mem, dt):
-    forces = np.zeros_like(pos)
-    new_mem = mem.copy()
-    divs = np.zeros(num_agents)
-    taus = np.zeros(num_agents)
+# Oscillateurs : les agents d'un même archétype partagent leur fréquence.
+# sin() n'est évalué qu'une fois par fréquence distincte, par blocs de
+# PHASE_BLOCK frames mis en cache, puis redistribué aux agents.
+PHASE_BLOCK = 64
+
+@lru_cache(maxsize=32)
+def _phase_index(key, n):
+    return np.unique(np.frombuffer(key), return_inverse=True)
+
+@lru_cache(maxsize=4)
+def _phase_block(key, n, block):
+    freqs, _ = _phase_index(key, n)
+    frames = np.arange(block * PHASE_BLOCK, (block + 1) * PHASE_BLOCK)
+    return (np.sin(frames[:, None] * freqs[None, :]) + 1) / 2
+
+def oscillator_phases(freq, frame):
+    """(sin(frame * freq) + 1) / 2 pour chaque agent, lu dans la table du bloc courant."""
+    key = np.ascontiguousarray(freq, dtype=float).tobytes()
+    _, inverse = _phase_index(key, len(freq))
+    return _phase_block(key, len(freq), frame // PHASE_BLOCK)[frame % PHASE_BLOCK][inverse]
+
+def scar_metrics(memory):
+    """Cicatrice topologique (lien le plus fort) et résilience du système (%)."""
+    scar_strength = float(np.max(memory))
+    return scar_strength, max(0.0, 100 - scar_strength * 20)
+
+def propagate_stress(pos, states, mem, threshold=0.5):
+    """
+    Flux de stress entrant : seuls les agents en crise (states > threshold)
+    émettent, et uniquement le long de leurs liens mémoriels existants.
+    Coût ~ (agents actifs) x (leurs liens), au lieu de N².
+    """
+    incoming = np.zeros(len(states))
+    active = np.flatnonzero(states > threshold)
+    if len(active) == 0: return incoming
     
-    # 1. Neuro-Dynamique (Mémoire & Thérapie)
-    for i in range(num_agents):
-        resonances_i = np.zeros(num_agents)
-        for j in range(num_agents):
-            if i == j: continue
-            dist = np.linalg.norm(pos[i] - pos[j])
-            prox_factor = 1.0 / (dist**2 + 0.5)
-            phase_sync = 1.0 - abs(phases[i] - phases[j])
-            R_ij = states[j] * phase_sync * prox_factor
-            resonances_i[j] = R_ij
-            
-        D_i = calculate_entropy(resonances_i)
-        divs[i] = D_i
-        tau_i = PARAMS['tau_min'] + (PARAMS['tau_max'] - PARAMS['tau_min']) * (D_i ** PARAMS['gamma'])
-        taus[i] = tau_i
-        
-        for j in range(num_agents):
-            if i == j: continue
-            decay_term = mem[i,j] / tau_i
-            growth_term = PARAMS['eta'] * resonances_i[j]
-            new_mem[i,j] += (growth_term - decay_term) * dt
-            new_mem[i,j] = max(0, new_mem[i,j])
+    # Liens sortants des émetteurs : memory[j,i] (Asymétrie Clé)
+    rows = mem[active]
+    src, dst = np.nonzero(rows)
+    keep = dst != active[src]
+    src, dst = src[keep], dst[keep]
+    if len(dst) == 0: return incoming
+    
+    j = active[src]
+    dist = np.linalg.norm(pos[dst] - pos[j], axis=1)
+    contrib = states[j] * rows[src, dst] * (1.0 / dist)
+    # bincount somme dans l'ordre des émetteurs (même ordre que la boucle i/j)
+    return np.bincount(dst, weights=contrib, minlength=len(states))
 
+def update_geometry_and_memory(pos, vel, states, phases, mem, dt, params=PARAMS, rest=REST_DISTANCES, cached=None):
+    """
+    Passe vectorisée : résonances -> diversité/tau -> mémoire -> forces.
+    cached=(divs, taus) réutilise la diversité du tick précédent (mode aperçu).
+    """
+    n = len(pos)
+    off_diag = ~np.eye(n, dtype=bool)
+    diff = pos[None, :, :] - pos[:, None, :] # diff[i,j] = pos[j] - pos[i]
+    dist = np.sqrt(np.sum(diff ** 2, axis=-1))
+    
+    # 1. Neuro-Dynamique (Mémoire & Thérapie)
+    prox_factor = 1.0 / (dist**2 + 0.5)
+    phase_sync = 1.0 - np.abs(phases[:, None] - phases[None, :])
+    resonances = np.where(off_diag, states[None, :] * phase_sync * prox_factor, 0.0)
+    
+    if cached is None:
+        divs = calculate_entropy(resonances)
+        taus = params['tau_min'] + (params['tau_max'] - params['tau_min']) * (divs ** params['gamma'])
+    else:
+        divs, taus = cached
+    
+    decay_term = mem / taus[:, None]
+    growth_term = params['eta'] * resonances
+    new_mem = np.where(off_diag, np.maximum(0, mem + (growth_term - decay_term) * dt), mem)
+    
     # 2. Topologie (Le Patch de Pauli)
-    for i in range(num_agents):
-        for j in range(i + 1, num_agents):
-            diff = pos[j] - pos[i]
-            dist = np.linalg.norm(diff)
-            if dist == 0: continue
-            dir_vec = diff / dist
-            
-            # Mémoire (Toujours attractive)
-            shared_memory = (new_mem[i,j] + new_mem[j,i]) / 2.0
-            f_mem = PARAMS['lambda_c'] * shared_memory
-            
-            # Élastique Linéaire (Attraction ou Répulsion selon position)
-            d0 = REST_DISTANCES[i,j]
-            delta_d = dist - d0 
-            # Si delta_d > 0 (loin) -> Positif (Attraction)
-            # Si delta_d < 0 (près) -> Négatif (Répulsion)
-            f_linear = PARAMS['kappa'] * delta_d
-            
-            # Barrière Cubique (Uniquement Répulsive / Protection Collision)
-            f_barrier = 0.0
-            if delta_d < 0: # COMPRESSION SEULEMENT
-                f_barrier = PARAMS['mu'] * (delta_d**3) # Négatif fort
-            
-            # Bilan Vectoriel
-            total_force_mag = f_mem + f_linear + f_barrier
-            
-            forces[i] += dir_vec * total_force_mag
-            forces[j] -= dir_vec * total_force_mag
-
-    vel = vel * (1 - PARAMS['friction']) + forces * dt
-    pos += vel * dt
+    linked = off_diag & (dist != 0)
+    dir_vec = diff / np.where(linked, dist, 1.0)[..., None]
+    
+    # Mémoire (Toujours attractive)
+    shared_memory = (new_mem + new_mem.T) / 2.0
+    f_mem = params['lambda_c'] * shared_memory
+    
+    # Élastique Linéaire : delta_d > 0 (loin) -> Attraction, delta_d < 0 (près) -> Répulsion
+    delta_d = dist - rest
+    f_linear = params['kappa'] * delta_d
+    
+    # Barrière Cubique (Uniquement Répulsive / Protection Collision)
+    f_barrier = np.where(delta_d < 0, params['mu'] * (delta_d**3), 0.0)
+    
+    # Bilan Vectoriel
+    total_force_mag = np.where(linked, f_mem + f_linear + f_barrier, 0.0)
+    forces = np.sum(dir_vec * total_force_mag[..., None], axis=1)
+    
+    vel = vel * (1 - params['friction']) + forces * dt
+    pos = pos + vel * dt # Nouveau tableau : les instantanés partagent l'ancien
     
     return pos, vel, new_mem, divs, taus
 
-# --- GRAPHIQUE ---
-plt.style.use('dark_background')
-fig = plt.figure(figsize=(16, 10))
-ax = fig.add_subplot(1, 2, 1, projection='3d')
-fig.patch.set_facecolor('#050505')
-ax.set_axis_off()
-ax_div = fig.add_subplot(2, 2, 2); ax_div.set_ylim(0, 1.1)
-ax_tau = fig.add_subplot(2, 2, 4); ax_tau.set_ylim(0, PARAMS['tau_max']*1.1)
-ax.text2D(0.5, 0.95, "PROJECT ANAMNESIS: FINAL BUILD", transform=ax.transAxes, ha='center', color='white', fontweight='bold')
-
-lines_div, lines_tau = [], []
-colors = [a['c'] for a in PARAMS['agents']]
-for i in range(num_agents):
-    l1, = ax_div.plot([], [], c=colors[i]); lines_div.append(l1)
-    l2, = ax_tau.plot([], [], c=colors[i], linestyle='--'); lines_tau.append(l2)
+# --- MONDE (État explicite, pour instantanés et branches) ---
+# Un monde est un dict de tableaux jamais modifiés sur place : chaque pas
+# produit de nouveaux tableaux, ce qui permet de partager l'état entre
+# instantanés et branches sans copie (voir anamnesis_branch.py).
+def new_world(agents=None, params=None, positions=None, seed=None):
+    agents = PARAMS['agents'] if agents is None else agents
+    params = PARAMS if params is None else params
+    positions = POSITIONS_INIT if positions is None else np.asarray(positions, dtype=float)
+    rest = rest_distances(positions)
+    n = len(positions)
+    return {
+        'frame': 0,
+        'positions': positions.copy(),
+        'velocities': np.zeros_like(positions),
+        'states': np.zeros(n),
+        'phases': np.zeros(n),
+        'memory': np.zeros((n, n)),
+        'divs': np.ones(n),
+        'taus': np.ones(n) * params['tau_max'],
+        'Tc': np.array([a['Tc'] for a in agents], dtype=float),
+        'alpha': np.array([a['alpha'] for a in agents], dtype=float),
+        'freq': np.array([a['freq'] for a in agents], dtype=float),
+        'rest': rest,
+        'agents': agents,
+        'params': params,
+        'rng': np.random.default_rng(seed),
+    }
 
-def update(f):
-    global frame, positions, velocities, states, memory_matrix, diversity_history, tau_history
-    frame = f
+def periodic_stress(frame, n):
+    """Stress Périodique : crises répétées sur le Visionnaire (agent 3)."""
+    stress_wave = np.zeros(n)
+    if frame > 200 and frame % 300 > 280: stress_wave[3] = 6.0
+    return stress_wave
+
+def step_world(world, external_stress=None):
+    """Avance le monde d'un pas. Renvoie un nouveau monde ; `world` reste intact."""
+    params, rng = world['params'], world['rng']
+    frame, states = world['frame'], world['states']
+    n = len(states)
+    external = np.zeros(n) if external_stress is None else external_stress
     
     # Oscillateurs
-    for i in range(num_agents): phases[i] = (np.sin(frame * PARAMS['agents'][i]['freq']) + 1) / 2
-    
-    # Stress Périodique
-    stress_wave = 6.0 if frame > 200 and frame % 300 > 280 else 0.0
+    phases = oscillator_phases(world['freq'], frame)
     
     # Flux
-    new_states = []
+    incoming_all = propagate_stress(world['positions'], states, world['memory'])
+    noise = rng.normal(params['noise_mean'], params['noise_std'], n)
+    my_stress = external + incoming_all * 0.1 + noise
+    new_states = internal_dynamics(states, my_stress, world['Tc'], world['alpha'], params['tau_decay'], params['dt'])
+    
+    # Topologie (en aperçu, diversité/tau du tick précédent entre deux recalculs)
+    cached = None if frame % params['tau_refresh'] == 0 else (world['divs'], world['taus'])
+    pos, vel, mem, divs, taus = update_geometry_and_memory(world['positions'], world['velocities'], new_states, phases, world['memory'], params['dt'], params, world['rest'], cached)
+    
+    return dict(world, frame=frame + 1, positions=pos, velocities=vel, states=new_states,
+                phases=phases, memory=mem, divs=divs, taus=taus)
+
+# --- ÉTAT ---
+world = new_world()
+positions, velocities, states, phases, memory_matrix = (world[k] for k in ('positions', 'velocities', 'states', 'phases', 'memory')) # Asymétrique
+diversity_history = [world['divs']]
+tau_history = [world['taus']]
+recorder = None # TrajectoryWriter optionnel (--record)
+publisher = None # LivePublisher optionnel (--live)
+checkpointer, checkpoint_every = None, 500 # Checkpointer optionnel (--checkpoint)
+
+# --- GRAPHIQUE (chargé au premier rendu) ---
+colors = [a['c'] for a in PARAMS['agents']]
+fig = None
+
+def setup_figure():
+    global plt, fig, ax, ax_div, ax_tau, lines_div, lines_tau
+    if fig is not None: return fig
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D
+    
+    plt.style.use('dark_background')
+    fig = plt.figure(figsize=(16, 10))
+    ax = fig.add_subplot(1, 2, 1, projection='3d')
+    fig.patch.set_facecolor('#050505')
+    ax.set_axis_off()
+    ax_div = fig.add_subplot(2, 2, 2); ax_div.set_ylim(0, 1.1)
+    ax_tau = fig.add_subplot(2, 2, 4); ax_tau.set_ylim(0, PARAMS['tau_max']*1.1)
+    ax.text2D(0.5, 0.95, "PROJECT ANAMNESIS: FINAL BUILD", transform=ax.transAxes, ha='center', color='white', fontweight='bold')
+    
+    lines_div, lines_tau = [], []
     for i in range(num_agents):
-        incoming = 0
-        for j in range(num_agents):
-            if i == j: continue
-            dist = np.linalg.norm(positions[i] - positions[j])
-            coupling = memory_matrix[j,i] # Asymétrie Clé
-            if states[j] > 0.5: incoming += states[j] * coupling * (1.0/dist)
-        my_stress = (stress_wave if i == 3 else 0.0) + incoming * 0.1 + np.random.normal(0.1, 0.05)
-        new_states.append(internal_dynamics(states[i], my_stress, PARAMS['agents'][i]['Tc'], PARAMS['agents'][i]['alpha'], PARAMS['tau_decay'], PARAMS['dt']))
-    states[:] = new_states
-    
-    # Topologie
-    positions, velocities, memory_matrix, divs, taus = update_geometry_and_memory(positions, velocities, states, phases, memory_matrix, PARAMS['dt'])
+        l1, = ax_div.plot([], [], c=colors[i]); lines_div.append(l1)
+        l2, = ax_tau.plot([], [], c=colors[i], linestyle='--'); lines_tau.append(l2)
+    return fig
+
+def simulate(f):
+    global world, frame, positions, velocities, states, phases, memory_matrix, diversity_history, tau_history
+    frame = world['frame']
+    
+    # Flux & Topologie
+    world = step_world(world, periodic_stress(frame, num_agents))
+    positions, velocities, states, phases, memory_matrix = (world[k] for k in ('positions', 'velocities', 'states', 'phases', 'memory'))
+    divs, taus = world['divs'], world['taus']
     
     diversity_history.append(divs); tau_history.append(taus)
     if len(diversity_history) > 200: diversity_history.pop(0); tau_history.pop(0)
+    
+    if recorder is not None: recorder.record(frame, positions, states, phases, memory_matrix, divs, taus)
+    if publisher is not None: publisher.publish(world)
+    if checkpointer is not None and world['frame'] % checkpoint_every == 0: checkpointer.save(world, diversity_history, tau_history)
 
+def render(frame):
+    setup_figure()
+    
     # Rendu
     ax.clear(); ax.set_axis_off(); ax.view_init(elev=20, azim=frame * 0.1)
     for i in range(num_agents):
@@ -204,8 +331,36 @@ def update(f):
         lines_div[k].set_data(x, np.array(diversity_history)[:,k])
         lines_tau[k].set_data(x, np.array(tau_history)[:,k])
 
-ani = FuncAnimation(fig, update, frames=PARAMS['steps'], interval=10, blit=False)
-plt.show()
+def update(f):
+    simulate(f)
+    render(f)
+
+# --- RELECTURE ---
+def load_frame(data):
+    """Recharge une frame enregistrée dans l'état global (sans re-simuler)."""
+    global positions, states, phases, memory_matrix
+    positions, states, phases, memory_matrix = data['positions'], data['states'], data['phases'], data['memory']
+    diversity_history.append(data['divs']); tau_history.append(data['taus'])
+    if len(diversity_history) > 200: diversity_history.pop(0); tau_history.pop(0)
+
+def restore(path):
+    """Reprend la simulation au dernier checkpoint (trajectoire identique bit à bit)."""
+    global world, positions, velocities, states, phases, memory_matrix, diversity_history, tau_history
+    from anamnesis_checkpoint import resume
+    world, diversity_history, tau_history = resume(path)
+    positions, velocities, states, phases, memory_matrix = (world[k] for k in ('positions', 'velocities', 'states', 'phases', 'memory'))
+
+def replay(path):
+    from matplotlib.animation import FuncAnimation
+    from anamnesis_record import TrajectoryReader
+    reader = TrajectoryReader(path)
+    
+    def update_replay(k):
+        data = reader[k]
+        load_frame(data)
+        render(int(data['frame']))
+    
+    return FuncAnimation(setup_figure(), update_replay, frames=len(reader), interval=10, blit=False)
 
 # Ajoutez ces améliorations au code existant :
 
@@ -225,9 +380,15 @@ Mémoire Max: {np.max(memory_matrix):.2f}"""
               bbox=dict(boxstyle='round', facecolor='black', alpha=0.7))
 
 # 2. Traînées de particules (historique visuel)
-particle_trails = [deque(maxlen=50) for _ in range(num_agents)]
+particle_trails = None
 
 def update_trails():
+    global particle_trails
+    if particle_trails is None:
+        from collections import deque
+        particle_trails = [deque(maxlen=50) for _ in range(num_agents)]
+    setup_figure()
+    
     for i in range(num_agents):
         particle_trails[i].append(positions[i].copy())
     
@@ -240,6 +401,7 @@ def update_trails():
 
 # 3. Effets de pulsation sur les agents en crise
 def render_agents_with_effects():
+    setup_figure()
     for i in range(num_agents):
         size = 100 + states[i] * 100
         
@@ -255,6 +417,7 @@ def render_agents_with_effects():
 
 # 4. Visualisation de la mémoire comme "cordes tendues"
 def render_memory_links():
+    setup_figure()
     for i in range(num_agents):
         for j in range(i+1, num_agents):
             mem_strength = (memory_matrix[i,j] + memory_matrix[j,i]) / 2.0
@@ -273,3 +436,41 @@ def render_memory_links():
                        [positions[i,1], positions[j,1]],
                        [positions[i,2], positions[j,2]],
                        c=color, alpha=0.6, lw=width, linestyle=style)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="ANAMNESIS - simulation temps réel")
+    parser.add_argument('--record', metavar='FICHIER', help="enregistre la trajectoire (format binaire compressé)")
+    parser.add_argument('--replay', metavar='FICHIER', help="rejoue une trajectoire enregistrée sans re-simuler")
+    parser.add_argument('--live', metavar='NOM', help="publie chaque frame en mémoire partagée (anamnesis_live.py NOM)")
+    parser.add_argument('--headless', action='store_true', help="simule sans fenêtre (avec --live ou --record)")
+    parser.add_argument('--checkpoint', metavar='FICHIER', help="points de reprise périodiques (fichier mappé en mémoire)")
+    parser.add_argument('--every', type=int, default=500, help="période des checkpoints (frames)")
+    parser.add_argument('--resume', action='store_true', help="reprend depuis le dernier point de --checkpoint")
+    args = parser.parse_args()
+    
+    if args.record:
+        from anamnesis_record import TrajectoryWriter
+        recorder = TrajectoryWriter(args.record, num_agents, meta={'agents': PARAMS['agents'], 'dt': PARAMS['dt']})
+    if args.checkpoint:
+        from anamnesis_checkpoint import Checkpointer
+        if args.resume: restore(args.checkpoint)
+        checkpointer, checkpoint_every = Checkpointer(args.checkpoint, num_agents), args.every
+    if args.live:
+        from anamnesis_live import LivePublisher
+        publisher = LivePublisher(args.live, num_agents)
+    try:
+        if args.headless:
+            while world['frame'] < PARAMS['steps']: simulate(world['frame'])
+        else:
+            from matplotlib.animation import FuncAnimation
+            setup_figure()
+            if args.replay:
+                ani = replay(args.replay)
+            else:
+                ani = FuncAnimation(fig, update, frames=PARAMS['steps'] - world['frame'], interval=10, blit=False, repeat=recorder is None)
+            plt.show()
+    finally:
+        if recorder is not None: recorder.close()
+        if publisher is not None: publisher.close()
+        if checkpointer is not None: checkpointer.close()
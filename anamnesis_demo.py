@@ -1,7 +1,6 @@
 # anamnesis_demo.py
 import streamlit as st
 import numpy as np
-import plotly.graph_objects as go
 from datetime import datetime
 
 st.set_page_config(page_title="ANAMNESIS - Traumatic Memory Simulator", layout="wide")
@@ -0,0 +1,86 @@
+import argparse
+import numpy as np
+from anamnesis_core import PARTY_AGENTS, PARTY_PARAMS, new_world, scar_metrics
+from anamnesis_branch import run
+
+# --- ENSEMBLES MONTE CARLO ---
+# Un run = un tirage du bruit ambiant. L'ensemble lance des réplicas en
+# parallèle, chacune avec son flux aléatoire indépendant (SeedSequence.spawn :
+# la réplica k a toujours la même graine, quel que soit l'ordonnancement),
+# et agrège cicatrice et résilience en moyennes + intervalles de confiance.
+# Arrêt séquentiel : on ajoute des lots de réplicas jusqu'à ce que les
+# intervalles soient assez serrés (ou jusqu'à max_replicas).
+
+IRREVERSIBLE_SCAR = 2.0 # Seuil du verdict "∞ (Irreversible)"
+
+def trauma_scenario(intensity, trauma_frame=100, agent=3, agents=PARTY_AGENTS, params=PARTY_PARAMS):
+    """Le scénario des démos : un choc unique sur un agent (le Leader par défaut)."""
+    stress = np.zeros(len(agents))
+    stress[agent] = intensity
+    return {'agents': agents, 'params': params, 'steps': params['steps'], 'events': {trauma_frame: stress}}
+
+def run_replica(args):
+    scenario, seed = args
+    world = new_world(scenario['agents'], scenario['params'], seed=seed)
+    world = run(world, scenario['steps'], scenario['events'])
+    return scar_metrics(world['memory'])
+
+def t_quantile(confidence, dof):
+    """Quantile de Student (développement de Cornish-Fisher, suffisant pour dof >= 5)."""
+    p = 0.5 + confidence / 2
+    # Quantile normal (Abramowitz & Stegun 26.2.23, erreur < 5e-4)
+    q = np.sqrt(-2 * np.log(1 - p))
+    z = q - (2.515517 + 0.802853 * q + 0.010328 * q ** 2) / (1 + 1.432788 * q + 0.189269 * q ** 2 + 0.001308 * q ** 3)
+    return z + (z ** 3 + z) / (4 * dof) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * dof ** 2)
+
+def confidence_interval(samples, confidence=0.95):
+    n = len(samples)
+    mean = float(np.mean(samples))
+    half_width = float(t_quantile(confidence, n - 1) * np.std(samples, ddof=1) / np.sqrt(n))
+    return mean, mean - half_width, mean + half_width
+
+def run_ensemble(scenario, seed=0, confidence=0.95, abs_tol=0.05, rel_tol=0.02,
+                 min_replicas=16, max_replicas=1024, batch=16, max_workers=None):
+    """
+    Lance des réplicas par lots jusqu'à ce que chaque intervalle ait une
+    demi-largeur <= max(abs_tol, rel_tol x |moyenne|). Renvoie les moyennes,
+    intervalles et la fraction de réplicas au verdict irréversible.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    seeds = np.random.SeedSequence(seed)
+    samples = []
+    with ProcessPoolExecutor(max_workers) as pool:
+        while len(samples) < max_replicas:
+            size = min(max(batch, min_replicas - len(samples)), max_replicas - len(samples))
+            samples += pool.map(run_replica, [(scenario, child) for child in seeds.spawn(size)])
+            if len(samples) < min_replicas: continue
+
+            summary = summarize(np.array(samples), confidence)
+            if all(hi - mean <= max(abs_tol, rel_tol * abs(mean)) for mean, lo, hi in
+                   (summary['scar_strength'], summary['resilience'])):
+                break
+    return summarize(np.array(samples), confidence)
+
+def summarize(samples, confidence=0.95):
+    scars, resiliences = samples[:, 0], samples[:, 1]
+    return {
+        'replicas': len(samples),
+        'scar_strength': confidence_interval(scars, confidence),
+        'resilience': confidence_interval(resiliences, confidence),
+        'irreversible': float(np.mean(scars > IRREVERSIBLE_SCAR)),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ANAMNESIS - ensemble Monte Carlo d'un trauma")
+    parser.add_argument('intensity', type=float)
+    parser.add_argument('--frame', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    summary = run_ensemble(trauma_scenario(args.intensity, args.frame), seed=args.seed, max_workers=args.workers)
+    print(f"Réplicas : {summary['replicas']}")
+    for key in ('scar_strength', 'resilience'):
+        mean, lo, hi = summary[key]
+        print(f"{key:>14} : {mean:.4f}  [{lo:.4f}, {hi:.4f}]")
+    print(f"  irréversible : {summary['irreversible']:.0%}")
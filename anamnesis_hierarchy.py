@@ -0,0 +1,331 @@
+import argparse
+import time
+import numpy as np
+from anamnesis_core import (PARAMS, POSITIONS_INIT, internal_dynamics, new_world, oscillator_phases, propagate_stress,
+                            rest_distances, scar_metrics, step_world, update_geometry_and_memory)
+
+# --- MONDES HIÉRARCHIQUES (FACTIONS) ---
+# Au-delà de quelques milliers d'agents, la mémoire de toutes les paires
+# (N²) n'est ni abordable ni utile. Les agents sont groupés en factions
+# (bissection récursive de l'espace, ou clé 'faction' des agents), puis les
+# factions en super-factions, etc. jusqu'à un groupe unique :
+#   - niveau 0 : dans une faction, la dynamique complète du moteur
+#     (propagate_stress, update_geometry_and_memory) sur ses membres ;
+#   - niveau L > 0 : chaque agent voit les groupes frères de son ancêtre
+#     depuis leur centroïde (Barnes-Hut). Il garde une ligne de mémoire
+#     moyenne vers chacun d'eux, et leurs forces comptent pour leurs w
+#     membres. Chaque paire d'agents est traitée une seule fois, au niveau
+#     où leurs ancêtres deviennent frères.
+# Raffinement à la demande : un agent frappé par un événement externe (ou en
+# crise forte) émet son stress vers les autres factions individuellement,
+# à ses vraies distances, au lieu de passer par le centroïde de sa faction.
+# Coût ~ N x taille de groupe x nombre de niveaux = O(N log N).
+# Avec une seule faction, le mode hiérarchique est identique au moteur.
+# Précision (compare(1024, 64, 150)) : états et cicatrice fidèles, mais la
+# géométrie est approchée : écart RMS des positions 4.7e-4 pour un
+# déplacement RMS de 7.8e-4 (~60 %), dû surtout à la mémoire moyenne vers
+# les groupes frères (ressorts exacts par paire : 6.6e-4, pas mieux).
+
+HIERARCHY = {
+    'faction_size': 64,      # Items max par groupe, à chaque niveau
+    'refine_threshold': 2.0, # États au-delà : agent raffiné
+    'max_refined': 32,       # Agents raffinés max par tick (les plus stressés)
+}
+
+# --- PARTITION ---
+def bisect(points, size):
+    """Bissection récursive selon l'axe le plus étendu : groupes de <= size points."""
+    groups, stack = [], [np.arange(len(points))]
+    while stack:
+        idx = stack.pop()
+        if len(idx) <= size:
+            groups.append(np.sort(idx)); continue
+        axis = np.ptp(points[idx], axis=0).argmax()
+        half = len(idx) // 2
+        order = np.argpartition(points[idx, axis], half)
+        stack += [idx[order[half:]], idx[order[:half]]]
+    return groups
+
+def _level(groups, owner, origin, weights):
+    """
+    Un niveau : groupes d'items, et pour chaque groupe ses agents rangés par
+    item (leaves), le rang de l'item de chaque agent (slots), les bornes de
+    chaque item dans leaves (pour les moyennes) et les lignes de mémoire.
+    """
+    group_of, slot_of = np.empty(len(origin), dtype=int), np.empty(len(origin), dtype=int)
+    for b, g in enumerate(groups): group_of[g], slot_of[g] = b, np.arange(len(g))
+    order = np.argsort(owner, kind='stable')
+    start = np.searchsorted(owner[order], np.arange(len(origin) + 1))
+    leaves = [np.concatenate([order[start[s]:start[s + 1]] for s in g]) for g in groups]
+    return {
+        'groups': groups, 'group_of': group_of, 'slot_of': slot_of,
+        'owner': owner, 'weights': weights, 'origin': origin,
+        'leaves': leaves,
+        'slots': [slot_of[owner[l]] for l in leaves],
+        'bounds': [np.concatenate([[0], np.cumsum(weights[g].astype(int))[:-1]]) for g in groups],
+        'memory': [np.zeros((len(l), len(g))) for l, g in zip(leaves, groups)],
+    }
+
+def build_levels(positions, size, factions=None):
+    """Hiérarchie complète : niveau 0 = factions d'agents, dernier niveau = un seul groupe."""
+    n = len(positions)
+    if factions is None: groups = bisect(positions, size)
+    else: groups = [np.flatnonzero(factions == f) for f in np.unique(factions)]
+    owner, points, weights = np.arange(n), positions, np.ones(n)
+    levels = []
+    while True:
+        levels.append(_level(groups, owner, points, weights))
+        if len(groups) == 1: break
+        # Items du niveau suivant : les groupes de celui-ci (centroïdes)
+        owner = levels[-1]['group_of'][owner]
+        weights = np.bincount(owner, minlength=len(groups)).astype(float)
+        points = _aggregate(owner, weights, positions)
+        groups = bisect(points, size)
+    # Niveau 0 : blocs du moteur complet (mémoire carrée, distances de repos)
+    levels[0]['memory'] = [np.zeros((len(g), len(g))) for g in levels[0]['groups']]
+    levels[0]['rest'] = [rest_distances(positions[g]) for g in levels[0]['groups']]
+    return levels
+
+def new_hworld(agents=None, params=None, positions=None, seed=None, factions=None):
+    """Comme new_world, sans matrice N x N : la mémoire vit dans les blocs de la hiérarchie."""
+    agents = PARAMS['agents'] if agents is None else agents
+    params = dict(PARAMS, **HIERARCHY) if params is None else dict(HIERARCHY, **params)
+    positions = POSITIONS_INIT if positions is None else np.asarray(positions, dtype=float)
+    n = len(positions)
+    if factions is None and 'faction' in agents[0]: factions = np.array([a['faction'] for a in agents])
+    return {
+        'frame': 0,
+        'positions': positions.copy(),
+        'velocities': np.zeros_like(positions),
+        'states': np.zeros(n),
+        'phases': np.zeros(n),
+        'divs': np.ones(n),
+        'taus': np.ones(n) * params['tau_max'],
+        'Tc': np.array([a['Tc'] for a in agents], dtype=float),
+        'alpha': np.array([a['alpha'] for a in agents], dtype=float),
+        'freq': np.array([a['freq'] for a in agents], dtype=float),
+        'levels': build_levels(positions, params['faction_size'], factions),
+        'agents': agents,
+        'params': params,
+        'rng': np.random.default_rng(seed),
+    }
+
+# --- MOTEUR HIÉRARCHIQUE ---
+def _aggregate(owner, weights, values):
+    if values.ndim == 1: return np.bincount(owner, weights=values, minlength=len(weights)) / weights
+    return np.stack([_aggregate(owner, weights, values[:, k]) for k in range(values.shape[1])], axis=1)
+
+def _resonances(pos, states, phases):
+    # Mêmes résonances que update_geometry_and_memory (agent i -> agent j)
+    dist2 = np.sum((pos[None, :, :] - pos[:, None, :]) ** 2, axis=-1)
+    return np.where(~np.eye(len(pos), dtype=bool), states[None, :] * (1.0 - np.abs(phases[:, None] - phases[None, :])) / (dist2 + 0.5), 0.0)
+
+def _item_means(memory, bounds, weights):
+    """Mémoire moyenne des membres de chaque item vers chaque item frère (k x k)."""
+    return np.add.reduceat(memory, bounds, axis=0) / weights[:, None]
+
+def _refined(world, external):
+    """Agents raffinés ce tick : frappés par un événement ou en crise forte."""
+    params, states = world['params'], world['states']
+    candidates = np.union1d(np.flatnonzero(external), np.flatnonzero(states > params['refine_threshold']))
+    if len(candidates) > params['max_refined']:
+        candidates = candidates[np.argsort(-(np.abs(external[candidates]) + states[candidates]))[:params['max_refined']]]
+    return candidates
+
+def _cross_stress(world, refined, threshold=0.5):
+    """
+    Flux de stress entre groupes frères (niveaux > 0). Un groupe émet la
+    somme des états de ses agents en crise, le long de la mémoire moyenne de
+    ses membres vers l'item du receveur ; les agents `refined` émettent
+    individuellement le long de leur propre ligne de mémoire.
+    """
+    pos, states, levels = world['positions'], world['states'], world['levels']
+    incoming = np.zeros(len(states))
+    emitting = np.where(states > threshold, states, 0.0)
+    emitting[refined] = 0.0
+    for level in levels[1:]:
+        owner, weights = level['owner'], level['weights']
+        centroids = _aggregate(owner, weights, pos)
+        emission = np.bincount(owner, weights=emitting, minlength=len(weights))
+        for g, leaves, slots, bounds, memory in zip(level['groups'], level['leaves'], level['slots'], level['bounds'], level['memory']):
+            toward = _item_means(memory, bounds, weights[g]).T[slots] # [agent, s] : mémoire s -> item de l'agent
+            dist = np.linalg.norm(centroids[None, g, :] - pos[leaves, None, :], axis=-1)
+            sibling = owner[leaves, None] != g[None, :]
+            incoming[leaves] += np.sum(np.where(sibling, emission[g] * toward / np.where(sibling, dist, 1.0), 0.0), axis=1)
+
+        for i in refined[states[refined] > threshold]:
+            b = level['group_of'][owner[i]]
+            leaves, slots, memory = level['leaves'][b], level['slots'][b], level['memory'][b]
+            row = memory[np.flatnonzero(leaves == i)[0]]
+            targets = slots != level['slot_of'][owner[i]]
+            others = leaves[targets]
+            incoming[others] += states[i] * row[slots[targets]] / np.linalg.norm(pos[others] - pos[i], axis=1)
+    return incoming
+
+def _far_field(levels, pos, states, phases):
+    """
+    Géométrie agent -> groupes frères (centroïdes), à chaque niveau, et
+    résonances R = (somme des états du groupe) x r(centroïde), réparties
+    uniformément sur ses membres actifs. Renvoie les termes d'entropie
+    (sum R, sum R log(R / actifs), partenaires) et, par groupe,
+    (diff, dist, frères, R) pour la mémoire et les forces.
+    """
+    n = len(pos)
+    total, plogp, partners, fields = np.zeros(n), np.zeros(n), np.zeros(n), []
+    for level in levels[1:]:
+        owner, weights = level['owner'], level['weights']
+        centroids, mean_phases = _aggregate(owner, weights, pos), _aggregate(owner, weights, phases)
+        mass = np.bincount(owner, weights=states, minlength=len(weights))
+        active = np.maximum(np.bincount(owner, weights=states > 0, minlength=len(weights)), 1)
+        level_fields = []
+        for g, leaves in zip(level['groups'], level['leaves']):
+            sibling = owner[leaves, None] != g[None, :]
+            diff = centroids[None, g, :] - pos[leaves, None, :]
+            dist = np.sqrt(np.sum(diff ** 2, axis=-1))
+            R = mass[g] * (1.0 - np.abs(phases[leaves, None] - mean_phases[None, g])) / (dist**2 + 0.5)
+            R = np.where(sibling & (R > 0), R, 0.0)
+            total[leaves] += R.sum(axis=1)
+            plogp[leaves] += np.sum(np.where(R > 0, R * np.log(np.where(R > 0, R, 1.0) / active[g]), 0.0), axis=1)
+            partners[leaves] += np.sum(np.where(R > 0, active[g], 0.0), axis=1)
+            level_fields.append((diff, dist, sibling, R))
+        fields.append(level_fields)
+    return (total, plogp, partners), fields
+
+def _faction_diversity(resonances, far, n, params):
+    """Comme calculate_entropy sur la ligne complète (proches exacts + groupes frères agrégés)."""
+    far_total, far_plogp, far_partners = far
+    total = resonances.sum(axis=1) + far_total
+    plogp = np.sum(np.where(resonances > 0, resonances * np.log(np.where(resonances > 0, resonances, 1.0)), 0.0), axis=1) + far_plogp
+    single = np.sum(resonances > 0, axis=1) + far_partners <= 1
+    safe = np.where(total < 1e-6, 1.0, total)
+    divs = np.where(total < 1e-6, 1.0, np.where(single, 0.0, (np.log(safe) - plogp / safe) / np.log(n)))
+    return divs, params['tau_min'] + (params['tau_max'] - params['tau_min']) * (divs ** params['gamma'])
+
+def _far_update(level, level_fields, origin, taus, dt, params=PARAMS):
+    """
+    Mémoire moyenne agent -> groupe frère (même loi que le moteur, moyennée
+    sur les membres : elle reste exacte puisque linéaire) et forces des
+    groupes frères : mémoire partagée, ressort et barrière vers le centroïde,
+    comptés pour chacun des w membres (repos = distance initiale), rendues
+    symétriques.
+    """
+    weights, forces, blocks = level['weights'], np.zeros((len(origin), 3)), []
+    for g, leaves, slots, bounds, memory, (diff, dist, sibling, R) in zip(
+            level['groups'], level['leaves'], level['slots'], level['bounds'], level['memory'], level_fields):
+        memory = np.where(sibling, np.maximum(0, memory + (params['eta'] * R / weights[g] - memory / taus[leaves, None]) * dt), 0.0)
+        shared = (memory + _item_means(memory, bounds, weights[g]).T[slots]) / 2.0
+        delta_d = dist - np.sqrt(np.sum((level['origin'][None, g, :] - origin[leaves, None, :]) ** 2, axis=-1))
+        magnitude = params['lambda_c'] * shared + params['kappa'] * delta_d + np.where(delta_d < 0, params['mu'] * delta_d**3, 0.0)
+        pair = diff * np.where(sibling, magnitude * weights[g] / np.where(sibling, dist, 1.0), 0.0)[..., None]
+        # Action/réaction : entre deux items a et s, les totaux calculés de
+        # chaque côté ne s'annulent pas exactement ; on retire la moitié de
+        # l'écart, uniformément sur les membres (la déformation interne des
+        # factions est préservée, la quantité de mouvement conservée).
+        totals = np.add.reduceat(pair, bounds, axis=0)
+        imbalance = (totals + totals.transpose(1, 0, 2)).sum(axis=1) / 2.0
+        forces[leaves] += pair.sum(axis=1) - (imbalance / weights[g][:, None])[slots]
+        blocks.append(memory)
+    return forces, dict(level, memory=blocks)
+
+def step_hworld(world, external_stress=None):
+    """Avance un monde hiérarchique d'un pas (même tirage de bruit que step_world)."""
+    params, rng, levels = world['params'], world['rng'], world['levels']
+    frame, states, pos, vel = world['frame'], world['states'], world['positions'], world['velocities']
+    n = len(states)
+    external = np.zeros(n) if external_stress is None else np.asarray(external_stress, dtype=float)
+
+    # Oscillateurs
+    phases = oscillator_phases(world['freq'], frame)
+
+    # Flux : complet dans chaque faction, agrégé entre factions
+    faction = levels[0]
+    incoming = np.zeros(n)
+    for g, mem in zip(faction['groups'], faction['memory']):
+        incoming[g] = propagate_stress(pos[g], states[g], mem)
+    if len(levels) > 1: incoming += _cross_stress(world, _refined(world, external))
+    noise = rng.normal(params['noise_mean'], params['noise_std'], n)
+    new_states = internal_dynamics(states, external + incoming * 0.1 + noise, world['Tc'], world['alpha'], params['tau_decay'], params['dt'])
+
+    # Moteur complet dans chaque faction (diversité sur la ligne complète)
+    far, fields = _far_field(levels, pos, new_states, phases)
+    new_pos, new_vel, divs, taus = np.empty_like(pos), np.empty_like(vel), np.empty(n), np.empty(n)
+    blocks = []
+    for g, mem, rest in zip(faction['groups'], faction['memory'], faction['rest']):
+        cached = None if len(levels) == 1 else _faction_diversity(_resonances(pos[g], new_states[g], phases[g]), tuple(x[g] for x in far), n, params)
+        new_pos[g], new_vel[g], block, divs[g], taus[g] = update_geometry_and_memory(pos[g], vel[g], new_states[g], phases[g], mem, params['dt'], params, rest, cached)
+        blocks.append(block)
+    new_levels = [dict(faction, memory=blocks)]
+
+    # Groupes frères : les forces s'ajoutent linéairement (vel += F dt, pos += F dt²)
+    for level, level_fields in zip(levels[1:], fields):
+        forces, level = _far_update(level, level_fields, faction['origin'], taus, params['dt'], params)
+        new_vel = new_vel + forces * params['dt']
+        new_pos = new_pos + forces * params['dt'] ** 2
+        new_levels.append(level)
+
+    return dict(world, frame=frame + 1, positions=new_pos, velocities=new_vel, states=new_states,
+                phases=phases, divs=divs, taus=taus, levels=new_levels)
+
+def hierarchy_scar(world):
+    """Cicatrice (lien le plus fort : factions, puis moyennes vers les groupes frères) et résilience."""
+    return scar_metrics(np.array([block.max() for level in world['levels'] for block in level['memory']]))
+
+# --- PRÉCISION (contre le moteur toutes paires) ---
+def compare(num_agents=512, faction_size=64, steps=300, trauma_frame=50, duration=20, intensity=6.0, seed=0):
+    """
+    Même monde, même bruit, même trauma (5 % des agents, une faction,
+    pendant `duration` frames) : écarts du mode hiérarchique au moteur
+    complet, et temps par tick.
+    """
+    rng = np.random.default_rng(seed)
+    agents = [PARAMS['agents'][i % len(PARAMS['agents'])] for i in range(num_agents)]
+    positions = rng.uniform(-1, 1, (num_agents, 3)) * 1.8 * num_agents ** (1 / 3)
+    params = dict(PARAMS, **dict(HIERARCHY, faction_size=faction_size))
+    exact, coarse = new_world(agents, params, positions, seed=seed), new_hworld(agents, params, positions, seed=seed)
+
+    stress = np.zeros(num_agents)
+    stress[coarse['levels'][0]['groups'][0][:max(1, num_agents // 20)]] = intensity
+    timings = {'exact': 0.0, 'coarse': 0.0}
+    for _ in range(steps):
+        events = stress if trauma_frame <= exact['frame'] < trauma_frame + duration else None
+        t0 = time.perf_counter()
+        exact = step_world(exact, events)
+        t1 = time.perf_counter()
+        coarse = step_hworld(coarse, events)
+        timings['exact'] += t1 - t0; timings['coarse'] += time.perf_counter() - t1
+
+    # Mémoire : blocs des factions, puis moyennes agent -> groupe frère
+    rms = lambda x: float(np.sqrt(np.mean(np.square(x))))
+    intra, intra_ref, cross, cross_ref = [], [], [], []
+    for g, block in zip(coarse['levels'][0]['groups'], coarse['levels'][0]['memory']):
+        intra.append(block.ravel()); intra_ref.append(exact['memory'][np.ix_(g, g)].ravel())
+    for level in coarse['levels'][1:]:
+        for g, leaves, memory in zip(level['groups'], level['leaves'], level['memory']):
+            means = np.stack([exact['memory'][leaves][:, level['owner'] == s].mean(axis=1) for s in g], axis=1)
+            sibling = level['owner'][leaves, None] != g[None, :]
+            cross.append(memory[sibling]); cross_ref.append(means[sibling])
+    intra, intra_ref = np.concatenate(intra), np.concatenate(intra_ref)
+    cross, cross_ref = (np.concatenate(x) if x else np.zeros(1) for x in (cross, cross_ref))
+    return {
+        'agents': num_agents, 'levels': len(coarse['levels']),
+        'states_rel_error': rms(coarse['states'] - exact['states']) / rms(exact['states']),
+        'positions_rms_error': rms(coarse['positions'] - exact['positions']),
+        'displacement_rms': rms(exact['positions'] - positions),
+        'faction_memory_rel_error': rms(intra - intra_ref) / rms(intra_ref),
+        'cross_memory_rel_error': rms(cross - cross_ref) / max(rms(cross_ref), 1e-12),
+        'scar_exact': scar_metrics(exact['memory'])[0],
+        'scar_coarse': hierarchy_scar(coarse)[0],
+        'ms_per_tick_exact': timings['exact'] / steps * 1000,
+        'ms_per_tick_coarse': timings['coarse'] / steps * 1000,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ANAMNESIS - mode hiérarchique : précision contre le moteur complet")
+    parser.add_argument('--agents', type=int, default=512)
+    parser.add_argument('--faction-size', type=int, default=64)
+    parser.add_argument('--steps', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for key, value in compare(args.agents, args.faction_size, args.steps, seed=args.seed).items():
+        print(f"{key:>26} : {value:.6g}" if isinstance(value, float) else f"{key:>26} : {value}")
@@ -0,0 +1,128 @@
+import argparse
+from multiprocessing import shared_memory
+import numpy as np
+
+# --- VISUALISATION EN DIRECT (MÉMOIRE PARTAGÉE) ---
+# Le moteur publie son état dans une zone de mémoire partagée à double
+# tampon ; des visualiseurs (autres processus) s'y attachent et s'en
+# détachent à tout moment sans jamais bloquer la simulation.
+#   En-tête int64 : [version, num_agents, tampon courant, seq0, seq1, frame0, frame1, -]
+#   Tampons 0 et 1 : positions, states, phases, memory, divs, taus (float64)
+# Écriture : toujours dans le tampon inactif, encadrée par son compteur de
+# séquence (impair = écriture en cours), puis bascule du tampon courant.
+# Lecture : copie du tampon courant, validée si le compteur n'a pas bougé
+# et est pair ; sinon on recommence (seqlock).
+
+VERSION = 1
+HEADER = 8
+_VERSION, _AGENTS, _LATEST, _SEQ, _FRAME = 0, 1, 2, 3, 5
+_published = set() # Zones créées par ce processus
+
+def _layout(num_agents):
+    n = num_agents
+    return [('positions', (n, 3)), ('states', (n,)), ('phases', (n,)),
+            ('memory', (n, n)), ('divs', (n,)), ('taus', (n,))]
+
+def _slot_size(num_agents):
+    return sum(int(np.prod(shape)) for _, shape in _layout(num_agents))
+
+def _views(buf, num_agents):
+    header = np.ndarray((HEADER,), dtype=np.int64, buffer=buf)
+    slots, offset = [], HEADER * 8
+    for _ in range(2):
+        slot = {}
+        for name, shape in _layout(num_agents):
+            slot[name] = np.ndarray(shape, dtype=np.float64, buffer=buf, offset=offset)
+            offset += int(np.prod(shape)) * 8
+        slots.append(slot)
+    return header, slots
+
+class LivePublisher:
+    """Côté moteur : publish(world) à chaque tick, coût = une copie de l'état."""
+    def __init__(self, name, num_agents):
+        size = HEADER * 8 + 2 * _slot_size(num_agents) * 8
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _published.add(name)
+        self.header, self.slots = _views(self.shm.buf, num_agents)
+        self.header[:] = 0
+        self.header[_VERSION], self.header[_AGENTS], self.header[_LATEST] = VERSION, num_agents, 1
+
+    def publish(self, world):
+        slot = 1 - self.header[_LATEST]
+        self.header[_SEQ + slot] += 1 # Impair : écriture en cours
+        for name, view in self.slots[slot].items(): view[...] = world[name]
+        self.header[_FRAME + slot] = world['frame']
+        self.header[_SEQ + slot] += 1 # Pair : tampon cohérent
+        self.header[_LATEST] = slot
+
+    def close(self):
+        del self.header, self.slots
+        self.shm.close()
+        self.shm.unlink()
+        _published.discard(self.shm.name.lstrip('/'))
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 : le resource_tracker supprimerait la zone à la sortie du visualiseur
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _published: resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+class LiveViewer:
+    """Côté visualiseur : read() renvoie la dernière frame cohérente (ou None)."""
+    def __init__(self, name):
+        self.shm = _attach(name)
+        num_agents = int(np.ndarray((HEADER,), dtype=np.int64, buffer=self.shm.buf)[_AGENTS])
+        self.num_agents = num_agents
+        self.header, self.slots = _views(self.shm.buf, num_agents)
+
+    def read(self, retries=100):
+        for _ in range(retries):
+            slot = int(self.header[_LATEST])
+            before = int(self.header[_SEQ + slot])
+            if before == 0: return None # Rien de publié encore
+            if before % 2: continue
+            data = {name: view.copy() for name, view in self.slots[slot].items()}
+            data['frame'] = int(self.header[_FRAME + slot])
+            if int(self.header[_SEQ + slot]) == before: return data
+        return None
+
+    def close(self):
+        del self.header, self.slots
+        self.shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def watch(name, interval=50):
+    """Visualiseur matplotlib : rejoue le rendu du core sur les frames publiées."""
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+    import anamnesis_core as core
+    viewer = LiveViewer(name)
+    last = [None]
+
+    def update(_):
+        data = viewer.read()
+        if data is None or data['frame'] == last[0]: return
+        last[0] = data['frame']
+        core.load_frame(data)
+        core.render(data['frame'])
+
+    ani = FuncAnimation(core.setup_figure(), update, interval=interval, blit=False, cache_frame_data=False)
+    plt.show()
+    viewer.close()
+    return ani
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ANAMNESIS - visualiseur attaché à une simulation en cours")
+    parser.add_argument('name', help="nom de la zone partagée (anamnesis_core.py --live NOM)")
+    parser.add_argument('--interval', type=int, default=50, help="période de rafraîchissement (ms)")
+    args = parser.parse_args()
+    watch(args.name, args.interval)
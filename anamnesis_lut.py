@@ -0,0 +1,127 @@
+import argparse
+from bisect import bisect_right
+import numpy as np
+from anamnesis_core import PARTY_AGENTS, PARTY_PARAMS, new_world, scar_metrics
+from anamnesis_branch import run
+
+# --- TABLES D'ISSUES PRÉCALCULÉES ---
+# En jeu, on ne peut pas lancer le moteur pour savoir ce qu'un événement va
+# faire à l'équipe. Le constructeur (hors ligne) balaie type de trauma x
+# intensité x lien initial, et stocke les issues dans un .npz compact.
+# À l'exécution, OutcomeTable répond par interpolation multilinéaire en
+# Python pur (quelques microsecondes), avec l'erreur mesurée de la cellule
+# pour chaque sortie (unités différentes : cicatrice vs résilience en %).
+
+# Répartition du stress selon le type d'événement (index dans PARTY_AGENTS)
+TRAUMA_TYPES = {
+    'Player Betrayal': {3: 1.0},                          # Le Leader encaisse seul
+    'Ally Death':      {0: 0.6, 1: 0.6, 2: 0.6, 3: 0.6},  # Deuil collectif
+    'Territory Lost':  {0: 1.0, 3: 0.5},
+    'Trust Broken':    {1: 1.0, 3: 0.5},
+}
+
+INTENSITIES = np.linspace(1.0, 10.0, 10)
+BONDS = np.linspace(0.0, 2.0, 5)   # Lien mémoriel initial (uniforme)
+TRAUMA_FRAME = 100
+
+def output_names(agents=PARTY_AGENTS):
+    return ['scar_strength', 'resilience'] + [f"scar:{a['name']}" for a in agents]
+
+def simulate_outcome(trauma_type, intensity, bond, seeds=(0, 1, 2, 3), agents=PARTY_AGENTS, params=PARTY_PARAMS):
+    """Issue moyenne du moteur réel : [cicatrice, résilience, cicatrice par agent...]"""
+    outcomes = []
+    for seed in seeds:
+        world = new_world(agents, params, seed=seed)
+        n = len(world['states'])
+        world['memory'] = bond * (1 - np.eye(n))
+        stress = np.zeros(n)
+        for agent, weight in TRAUMA_TYPES[trauma_type].items(): stress[agent] = weight * intensity
+        world = run(world, params['steps'], {TRAUMA_FRAME: stress})
+        scar_strength, resilience = scar_metrics(world['memory'])
+        outcomes.append([scar_strength, resilience] + list(world['memory'].max(axis=1)))
+    return np.mean(outcomes, axis=0)
+
+def _simulate(args):
+    return simulate_outcome(*args)
+
+def build_table(path, intensities=INTENSITIES, bonds=BONDS, seeds=(0, 1, 2, 3), max_workers=None):
+    """
+    Construit la table sur la grille, puis mesure l'erreur d'interpolation
+    de chaque sortie au centre de chaque cellule contre le moteur réel
+    (mêmes graines). Erreur mesurée, pas une borne : elle peut être
+    dépassée ailleurs dans la cellule.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    types = list(TRAUMA_TYPES)
+    nodes = [(t, i, b, seeds) for t in types for i in intensities for b in bonds]
+    mids_i = (intensities[:-1] + intensities[1:]) / 2
+    mids_b = (bonds[:-1] + bonds[1:]) / 2
+    mids = [(t, i, b, seeds) for t in types for i in mids_i for b in mids_b]
+
+    with ProcessPoolExecutor(max_workers) as pool:
+        values = np.array(list(pool.map(_simulate, nodes, chunksize=4)))
+        truth = np.array(list(pool.map(_simulate, mids, chunksize=4)))
+
+    values = values.reshape(len(types), len(intensities), len(bonds), -1)
+    truth = truth.reshape(len(types), len(mids_i), len(mids_b), -1)
+    # Au centre d'une cellule, l'interpolation multilinéaire = moyenne des coins
+    interp = (values[:, :-1, :-1] + values[:, 1:, :-1] + values[:, :-1, 1:] + values[:, 1:, 1:]) / 4
+    errors = np.abs(interp - truth) # (types, cellules i, cellules b, sorties)
+
+    np.savez_compressed(path, types=np.array(types), outputs=np.array(output_names()),
+                        intensities=intensities, bonds=bonds,
+                        values=values.astype(np.float32), errors=errors.astype(np.float32))
+    return values, errors
+
+def _locate(axis, x):
+    x = min(max(x, axis[0]), axis[-1])
+    k = min(bisect_right(axis, x) - 1, len(axis) - 2)
+    return k, (x - axis[k]) / (axis[k + 1] - axis[k])
+
+class OutcomeTable:
+    """Table chargée en listes Python : pas d'appel NumPy au moment de la requête."""
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.types = {t: k for k, t in enumerate(data['types'].tolist())}
+            self.outputs = data['outputs'].tolist()
+            self.intensities = data['intensities'].tolist()
+            self.bonds = data['bonds'].tolist()
+            self._values = data['values'].tolist()
+            self._errors = data['errors'].tolist()
+
+    def query(self, trauma_type, intensity, bond=0.0):
+        """Issue interpolée, plus 'error:<sortie>' : erreur mesurée au centre de la cellule."""
+        t = self.types[trauma_type]
+        ki, wi = _locate(self.intensities, intensity)
+        kb, wb = _locate(self.bonds, bond)
+        v = self._values[t]
+        corners = ((v[ki][kb], (1 - wi) * (1 - wb)), (v[ki + 1][kb], wi * (1 - wb)),
+                   (v[ki][kb + 1], (1 - wi) * wb), (v[ki + 1][kb + 1], wi * wb))
+        result = dict.fromkeys(self.outputs, 0.0)
+        for row, weight in corners:
+            for name, value in zip(self.outputs, row):
+                result[name] += weight * value
+        for name, error in zip(self.outputs, self._errors[t][ki][kb]): result[f"error:{name}"] = error
+        return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ANAMNESIS - tables d'issues précalculées")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="construit la table (hors ligne)")
+    build.add_argument('path')
+    build.add_argument('--workers', type=int, default=None)
+    query = sub.add_parser('query', help="interroge une table")
+    query.add_argument('path')
+    query.add_argument('trauma_type', choices=list(TRAUMA_TYPES))
+    query.add_argument('intensity', type=float)
+    query.add_argument('--bond', type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        values, errors = build_table(args.path, max_workers=args.workers)
+        print(f"✅ Table écrite : {args.path} ({values.shape[:3]})")
+        for name, error in zip(output_names(), errors.reshape(-1, errors.shape[-1]).max(axis=0)):
+            print(f"   erreur max {name:>16} : {error:.4f}")
+    else:
+        for name, value in OutcomeTable(args.path).query(args.trauma_type, args.intensity, args.bond).items():
+            print(f"{name:>16} : {value:.4f}")
@@ -0,0 +1,172 @@
+import json
+import struct
+import zlib
+import numpy as np
+
+# --- ENREGISTREUR DE TRAJECTOIRES ANAMNESIS ---
+# Format binaire compressé, découpé en blocs (chunks) :
+#   [MAGIC][version u16][taille en-tête u32][en-tête JSON]
+#   [bloc 0][bloc 1]...            (zlib, un bloc = chunk_size frames)
+#   [index JSON][offset index u64][MAGIC]
+# Chaque champ est quantifié en int32 (pas fixe). Les champs lents
+# (positions, mémoire, tau) sont encodés en delta à l'intérieur d'un bloc :
+# la première frame du bloc sert d'image clé, ce qui permet l'accès direct.
+
+MAGIC = b'ANAM'
+VERSION = 1
+
+# nom -> (pas de quantification, encodage delta)
+FIELDS = {
+    'frame':     (1.0,  True),
+    'positions': (1e-4, True),
+    'states':    (1e-4, False),
+    'phases':    (1e-5, False),
+    'memory':    (1e-5, True),
+    'divs':      (1e-4, False),
+    'taus':      (1e-2, True),
+}
+
+_INT32 = np.iinfo(np.int32)
+
+def field_shape(name, num_agents):
+    if name == 'frame': return ()
+    if name == 'positions': return (num_agents, 3)
+    if name == 'memory': return (num_agents, num_agents)
+    return (num_agents,)
+
+def quantize(values, step):
+    q = np.rint(np.asarray(values, dtype=np.float64) / step)
+    return np.clip(q, _INT32.min, _INT32.max).astype(np.int32)
+
+class TrajectoryWriter:
+    """
+    Écrit une trajectoire tick par tick. Les frames sont tamponnées puis
+    compressées par blocs de `chunk_size`. Le fichier n'est lisible
+    qu'après close() (l'index est écrit en fin de fichier).
+    """
+    def __init__(self, path, num_agents, chunk_size=256, level=6, meta=None):
+        self.num_agents = num_agents
+        self.chunk_size = chunk_size
+        self.level = level
+        self.fields = dict(FIELDS)
+        self._buffer = {name: [] for name in self.fields}
+        self._index = []
+        self._frames = 0
+        self._file = open(path, 'wb')
+
+        header = json.dumps({
+            'num_agents': num_agents,
+            'chunk_size': chunk_size,
+            'fields': [[name, step, delta] for name, (step, delta) in self.fields.items()],
+            'meta': meta or {},
+        }).encode('utf-8')
+        self._file.write(MAGIC + struct.pack('<HI', VERSION, len(header)) + header)
+
+    def record(self, frame, positions, states, phases, memory, divs, taus):
+        values = {'frame': frame, 'positions': positions, 'states': states, 'phases': phases,
+                  'memory': memory, 'divs': divs, 'taus': taus}
+        for name, (step, _) in self.fields.items():
+            self._buffer[name].append(quantize(values[name], step))
+        self._frames += 1
+        if len(self._buffer['frame']) >= self.chunk_size: self._flush()
+
+    def _flush(self):
+        n = len(self._buffer['frame'])
+        if n == 0: return
+        parts = []
+        for name, (_, delta) in self.fields.items():
+            block = np.stack(self._buffer[name])
+            if delta: block[1:] = np.diff(block, axis=0)
+            parts.append(block.tobytes())
+            self._buffer[name] = []
+        blob = zlib.compress(b''.join(parts), self.level)
+        self._index.append([self._file.tell(), len(blob), n])
+        self._file.write(blob)
+
+    def close(self):
+        if self._file.closed: return
+        self._flush()
+        index_offset = self._file.tell()
+        self._file.write(json.dumps({'frames': self._frames, 'chunks': self._index}).encode('utf-8'))
+        self._file.write(struct.pack('<Q', index_offset) + MAGIC)
+        self._file.close()
+
+    def __len__(self):
+        return self._frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TrajectoryReader:
+    """
+    Accès aléatoire à une trajectoire enregistrée : reader[k] renvoie la
+    frame k (dict de tableaux). Seul le bloc contenant k est décompressé ;
+    le dernier bloc lu est gardé en cache pour la relecture séquentielle.
+    """
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        if self._file.read(4) != MAGIC: raise ValueError(f"{path}: pas un fichier ANAMNESIS")
+        version, header_len = struct.unpack('<HI', self._file.read(6))
+        if version != VERSION: raise ValueError(f"{path}: version {version} non supportée")
+        header = json.loads(self._file.read(header_len))
+        self.num_agents = header['num_agents']
+        self.chunk_size = header['chunk_size']
+        self.meta = header['meta']
+        self.fields = {name: (step, delta) for name, step, delta in header['fields']}
+
+        self._file.seek(-12, 2)
+        index_offset, magic = struct.unpack('<Q4s', self._file.read(12))
+        if magic != MAGIC: raise ValueError(f"{path}: fichier incomplet (enregistrement non fermé)")
+        self._file.seek(index_offset)
+        index = json.loads(self._file.read()[:-12])
+        self._frames = index['frames']
+        self._chunks = index['chunks']
+        self._cached = (None, None)
+
+    def chunk(self, c):
+        """Décode le bloc c : dict nom -> tableau (frames, *forme)."""
+        if self._cached[0] == c: return self._cached[1]
+        offset, length, n = self._chunks[c]
+        self._file.seek(offset)
+        raw = zlib.decompress(self._file.read(length))
+
+        data, pos = {}, 0
+        for name, (step, delta) in self.fields.items():
+            shape = (n,) + field_shape(name, self.num_agents)
+            size = int(np.prod(shape)) * 4
+            block = np.frombuffer(raw, dtype=np.int32, count=size // 4, offset=pos).reshape(shape)
+            pos += size
+            if delta: block = np.cumsum(block, axis=0, dtype=np.int64)
+            data[name] = block.astype(np.int64) if name == 'frame' else block * step
+        self._cached = (c, data)
+        return data
+
+    def iter_chunks(self):
+        for c in range(len(self._chunks)):
+            yield self.chunk(c)
+
+    def __getitem__(self, k):
+        if k < 0: k += self._frames
+        if not 0 <= k < self._frames: raise IndexError(k)
+        data = self.chunk(k // self.chunk_size)
+        r = k % self.chunk_size
+        return {name: values[r] for name, values in data.items()}
+
+    def __iter__(self):
+        for k in range(self._frames):
+            yield self[k]
+
+    def __len__(self):
+        return self._frames
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
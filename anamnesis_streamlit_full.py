@@ -1,142 +1,116 @@
 import streamlit as st
 import numpy as np
-import plotly.graph_objects as go
 from datetime import datetime
 import json
+import os
+import tempfile
 
 st.set_page_config(page_title="ANAMNESIS - NPC Trauma Simulator", layout="wide")
 
-# === PARAMS (copiés de ton core) ===
-POSITIONS_INIT = np.array([
-    [1.0, 1.0, 1.0],
-    [1.0, -1.0, -1.0],
-    [-1.0, 1.0, -1.0],
-    [-1.0, -1.0, 1.0]
-]) * 1.8
+# === MOTEUR (partagé avec anamnesis_core) ===
+# Même physique que le core : ressort linéaire, barrière de Pauli et tau_i
+# piloté par la diversité. Seule la fidélité (réglage moteur) change.
+from anamnesis_core import PARTY_AGENTS, PARTY_PARAMS, new_world, step_world, with_fidelity
+from anamnesis_branch import snapshot
+from anamnesis_ensemble import IRREVERSIBLE_SCAR, run_ensemble, trauma_scenario
+from anamnesis_record import TrajectoryReader, TrajectoryWriter
 
-num_agents = 4
+num_agents = len(PARTY_AGENTS)
 
-PARAMS = {
-    'steps': 300,  # Réduit pour Streamlit
-    'dt': 0.05,
-    'tau_decay': 15.0,
-    'eta': 0.1,
-    'tau_min': 100.0,
-    'tau_max': 2000.0,
-    'gamma': 2.5,
-    'lambda_c': 1.2,
-    'kappa': 0.5,
-    'mu': 5.0,
-    'friction': 0.15,
-    'agents': [
-        {'name': 'Warrior', 'Tc': 4.0, 'alpha': 0.0, 'freq': 0.05, 'color': '#00ffff'},
-        {'name': 'Diplomat', 'Tc': 0.8, 'alpha': 0.6, 'freq': 0.08, 'color': '#ffaa00'},
-        {'name': 'Scout', 'Tc': 1.5, 'alpha': 0.8, 'freq': 0.11, 'color': '#55ff55'},
-        {'name': 'Leader', 'Tc': 0.5, 'alpha': 1.2, 'freq': 0.14, 'color': '#ff00ff'}
-    ]
-}
-
-# === FONCTIONS (copiées de ton core) ===
-def calculate_entropy(resonances):
-    total_r = np.sum(resonances)
-    if total_r < 1e-6: return 1.0
-    probs = resonances / total_r
-    probs = probs[probs > 0]
-    if len(probs) <= 1: return 0.0
-    entropy = -np.sum(probs * np.log(probs))
-    max_entropy = np.log(len(resonances))
-    return entropy / max_entropy
-
-def internal_dynamics(theta, stress, Tc, alpha, tau, dt):
-    decay = -theta / tau
-    plasticity = alpha * (1.0 if stress > Tc else 0.0) * (stress - Tc)
-    return theta + (decay + plasticity) * dt
-
-def run_simulation(trauma_frame, trauma_intensity):
-    """Simulation complète avec trauma"""
-    positions = POSITIONS_INIT.copy()
-    velocities = np.zeros_like(positions)
-    states = np.zeros(num_agents)
-    phases = np.zeros(num_agents)
-    memory_matrix = np.zeros((num_agents, num_agents))
+def run_simulation(trauma_frame, trauma_intensity, fidelity='preview', seed=None, recorder=None):
+    """Simulation complète avec trauma (trajectoire complète dans `recorder` si fourni)"""
+    world = new_world(PARTY_AGENTS, with_fidelity(PARTY_PARAMS, fidelity), seed=seed)
     
     # Snapshots
     snapshot_before = None
     snapshot_after = None
     
-    for frame in range(PARAMS['steps']):
-        # Oscillateurs
-        for i in range(num_agents):
-            phases[i] = (np.sin(frame * PARAMS['agents'][i]['freq']) + 1) / 2
-        
-        # Trauma Event
-        stress_wave = 0.0
+    for frame in range(PARTY_PARAMS['steps']):
+        # Trauma Event (sur le Leader)
+        stress_wave = np.zeros(num_agents)
         if frame == trauma_frame:
-            stress_wave = trauma_intensity
-            snapshot_before = {
-                'positions': positions.copy(),
-                'memory': memory_matrix.copy(),
-                'states': states.copy()
-            }
-        
-        # Dynamique interne
-        new_states = []
-        for i in range(num_agents):
-            incoming = 0
-            for j in range(num_agents):
-                if i == j: continue
-                dist = np.linalg.norm(positions[i] - positions[j])
-                coupling = memory_matrix[j,i]
-                if states[j] > 0.5:
-                    incoming += states[j] * coupling * (1.0/dist)
-            
-            my_stress = (stress_wave if i == 3 else 0.0) + incoming * 0.1 + np.random.normal(0.01, 0.005)
-            new_states.append(internal_dynamics(
-                states[i], my_stress, 
-                PARAMS['agents'][i]['Tc'], 
-                PARAMS['agents'][i]['alpha'], 
-                PARAMS['tau_decay'], 
-                PARAMS['dt']
-            ))
-        states[:] = new_states
+            stress_wave[3] = trauma_intensity
+            snapshot_before = snapshot(world)
         
-        # Géométrie (version simplifiée)
-        forces = np.zeros_like(positions)
-        for i in range(num_agents):
-            for j in range(i+1, num_agents):
-                diff = positions[j] - positions[i]
-                dist = np.linalg.norm(diff)
-                if dist < 0.01: continue
-                dir_vec = diff / dist
-                
-                shared_mem = (memory_matrix[i,j] + memory_matrix[j,i]) / 2.0
-                f_total = PARAMS['lambda_c'] * shared_mem
-                
-                forces[i] += dir_vec * f_total
-                forces[j] -= dir_vec * f_total
-        
-        velocities = velocities * (1 - PARAMS['friction']) + forces * PARAMS['dt']
-        positions += velocities * PARAMS['dt']
-        
-        # Mémoire (simplifié)
-        for i in range(num_agents):
-            for j in range(num_agents):
-                if i == j: continue
-                dist = np.linalg.norm(positions[i] - positions[j])
-                growth = PARAMS['eta'] * states[j] * (1.0 / (dist**2 + 0.5))
-                decay = memory_matrix[i,j] / 500.0
-                memory_matrix[i,j] += (growth - decay) * PARAMS['dt']
-                memory_matrix[i,j] = max(0, memory_matrix[i,j])
+        world = step_world(world, stress_wave)
+        if recorder is not None:
+            recorder.record(frame, world['positions'], world['states'], world['phases'], world['memory'], world['divs'], world['taus'])
         
         # Snapshot après trauma
         if frame == trauma_frame + 50:
-            snapshot_after = {
-                'positions': positions.copy(),
-                'memory': memory_matrix.copy(),
-                'states': states.copy()
-            }
+            snapshot_after = snapshot(world)
+    
+    return snapshot_before, snapshot_after, world['memory']
+
+# === RENDU WEB ===
+# Deux traces quelle que soit la taille de la distribution : tous les liens
+# dans une seule trace de segments (séparés par des NaN), tous les agents
+# dans une seule trace de points (couleurs par point).
+LINK_THRESHOLD = 0.5
+SCENE_LAYOUT = dict(
+    scene=dict(
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        zaxis=dict(visible=False),
+        bgcolor='black'
+    ),
+    paper_bgcolor='black',
+    height=400
+)
+
+def scene_traces(pos, mem):
+    import plotly.graph_objects as go
     
-    return snapshot_before, snapshot_after, memory_matrix
+    # Links
+    i, j = np.triu_indices(len(pos), 1)
+    bond = mem[i, j] + mem[j, i]
+    keep = bond > LINK_THRESHOLD
+    i, j, bond = i[keep], j[keep], bond[keep]
+    gap = np.full(len(i), np.nan)
+    segments = [np.stack([pos[i, k], pos[j, k], gap], axis=1).ravel() for k in range(3)]
+    links = go.Scatter3d(
+        x=segments[0], y=segments[1], z=segments[2],
+        mode='lines',
+        line=dict(color=np.repeat(bond, 3), colorscale='Reds', cmin=0, cmax=4, width=3),
+        hoverinfo='skip',
+        showlegend=False
+    )
+    
+    # Agents
+    agents = go.Scatter3d(
+        x=pos[:, 0], y=pos[:, 1], z=pos[:, 2],
+        mode='markers+text',
+        marker=dict(size=15, color=[a['c'] for a in PARTY_AGENTS]),
+        text=[a['name'] for a in PARTY_AGENTS],
+        showlegend=False
+    )
+    return [links, agents]
+
+def scene_figure(pos, mem):
+    import plotly.graph_objects as go
+    fig = go.Figure(data=scene_traces(pos, mem))
+    fig.update_layout(**SCENE_LAYOUT)
+    return fig
+
+def timeline_figure(reader, stride=5):
+    """Frames d'animation Plotly calculées une fois depuis la trajectoire enregistrée."""
+    import plotly.graph_objects as go
+    steps = range(0, len(reader), stride)
+    frames = [go.Frame(data=scene_traces(reader[k]['positions'], reader[k]['memory']), name=str(k)) for k in steps]
+    
+    fig = go.Figure(data=frames[0].data, frames=frames)
+    fig.update_layout(
+        **dict(SCENE_LAYOUT, height=500),
+        updatemenus=[dict(type='buttons', showactive=False, buttons=[
+            dict(label='▶', method='animate', args=[None, dict(frame=dict(duration=50, redraw=True), fromcurrent=True)]),
+            dict(label='⏸', method='animate', args=[[None], dict(frame=dict(duration=0), mode='immediate')])
+        ])],
+        sliders=[dict(currentvalue=dict(prefix='Frame '), steps=[
+            dict(label=str(k), method='animate', args=[[str(k)], dict(frame=dict(duration=0, redraw=True), mode='immediate')])
+            for k in steps
+        ])]
+    )
+    return fig
 
 # === UI STREAMLIT ===
 st.title("🧠 ANAMNESIS - NPC Trauma Memory Engine")
@@ -151,10 +125,23 @@ trauma_type = st.sidebar.selectbox(
 
 trauma_intensity = st.sidebar.slider("Trauma Intensity", 1.0, 10.0, 5.0)
 trauma_timing = st.sidebar.slider("Trauma Frame", 50, 200, 100)
+fidelity = st.sidebar.radio("Engine Fidelity", ["preview", "full"], horizontal=True)
+seed = st.sidebar.number_input("Seed", min_value=0, value=0, step=1)
 
 if st.sidebar.button("🔥 RUN SIMULATION", type="primary"):
-    with st.spinner("Simulating psychological damage..."):
-        before, after, final_memory = run_simulation(trauma_timing, trauma_intensity)
+    # Un fichier unique par run : toutes les sessions partagent le même processus
+    fd, trajectory_path = tempfile.mkstemp(prefix="anamnesis_", suffix=".anam")
+    os.close(fd)
+    try:
+        with st.spinner("Simulating psychological damage..."):
+            with TrajectoryWriter(trajectory_path, num_agents, chunk_size=64, meta={'agents': PARTY_AGENTS}) as recorder:
+                before, after, final_memory = run_simulation(trauma_timing, trauma_intensity, fidelity, seed, recorder)
+        with TrajectoryReader(trajectory_path) as reader:
+            timeline = timeline_figure(reader)
+        with open(trajectory_path, 'rb') as trajectory:
+            trajectory_bytes = trajectory.read()
+    finally:
+        os.remove(trajectory_path)
     
     st.success(f"✅ Simulated: **{trauma_type}** (Intensity: {trauma_intensity})")
     
@@ -164,93 +151,50 @@ if st.sidebar.button("🔥 RUN SIMULATION", type="primary"):
     with col1:
         st.subheader("Before Trauma")
         if before:
-            fig = go.Figure()
-            pos = before['positions']
-            for i in range(num_agents):
-                fig.add_trace(go.Scatter3d(
-                    x=[pos[i,0]], y=[pos[i,1]], z=[pos[i,2]],
-                    mode='markers+text',
-                    marker=dict(size=15, color=PARAMS['agents'][i]['color']),
-                    text=PARAMS['agents'][i]['name'],
-                    name=PARAMS['agents'][i]['name']
-                ))
-            
-            fig.update_layout(
-                scene=dict(
-                    xaxis=dict(visible=False),
-                    yaxis=dict(visible=False),
-                    zaxis=dict(visible=False),
-                    bgcolor='black'
-                ),
-                paper_bgcolor='black',
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(scene_figure(before['positions'], before['memory']), use_container_width=True)
     
     with col2:
         st.subheader("After Trauma")
         if after:
-            fig = go.Figure()
-            pos = after['positions']
-            mem = after['memory']
-            
-            # Links
-            for i in range(num_agents):
-                for j in range(i+1, num_agents):
-                    if mem[i,j] + mem[j,i] > 0.5:
-                        fig.add_trace(go.Scatter3d(
-                            x=[pos[i,0], pos[j,0]],
-                            y=[pos[i,1], pos[j,1]],
-                            z=[pos[i,2], pos[j,2]],
-                            mode='lines',
-                            line=dict(color='red', width=3),
-                            showlegend=False
-                        ))
-            
-            # Agents
-            for i in range(num_agents):
-                fig.add_trace(go.Scatter3d(
-                    x=[pos[i,0]], y=[pos[i,1]], z=[pos[i,2]],
-                    mode='markers+text',
-                    marker=dict(size=15, color=PARAMS['agents'][i]['color']),
-                    text=PARAMS['agents'][i]['name'],
-                    name=PARAMS['agents'][i]['name']
-                ))
-            
-            fig.update_layout(
-                scene=dict(
-                    xaxis=dict(visible=False),
-                    yaxis=dict(visible=False),
-                    zaxis=dict(visible=False),
-                    bgcolor='black'
-                ),
-                paper_bgcolor='black',
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(scene_figure(after['positions'], after['memory']), use_container_width=True)
+    
+    st.subheader("🎞️ Timeline")
+    st.plotly_chart(timeline, use_container_width=True)
     
-    # === METRICS ===
+    # === METRICS (ensemble : un run n'est qu'un tirage du bruit) ===
     st.subheader("📊 Trauma Impact")
+    with st.spinner("Running Monte Carlo ensemble..."):
+        scenario = trauma_scenario(trauma_intensity, trauma_timing, params=with_fidelity(PARTY_PARAMS, fidelity))
+        ensemble = run_ensemble(scenario, seed=seed)
     m1, m2, m3 = st.columns(3)
     
-    scar_strength = np.max(final_memory)
+    scar_strength, scar_lo, scar_hi = ensemble['scar_strength']
+    confidence = f"95% CI over {ensemble['replicas']} runs"
     
     with m1:
-        st.metric("Topological Scar", f"{scar_strength:.2f}", f"+{scar_strength*0.8:.2f}")
+        st.metric("Topological Scar", f"{scar_strength:.2f}", f"+{scar_strength*0.8:.2f}",
+                  help=f"{confidence}: [{scar_lo:.2f}, {scar_hi:.2f}]")
     
     with m2:
-        recovery_time = "∞ (Irreversible)" if scar_strength > 2.0 else f"{int(scar_strength*100)} turns"
-        st.metric("Recovery Time", recovery_time)
+        recovery_time = "∞ (Irreversible)" if scar_strength > IRREVERSIBLE_SCAR else f"{int(scar_strength*100)} turns"
+        st.metric("Recovery Time", recovery_time,
+                  help=f"Irreversible in {ensemble['irreversible']:.0%} of {ensemble['replicas']} runs")
     
     with m3:
-        resilience = max(0, 100 - scar_strength*20)
-        st.metric("System Resilience", f"{resilience:.0f}%", f"-{100-resilience:.0f}%")
+        resilience, res_lo, res_hi = ensemble['resilience']
+        st.metric("System Resilience", f"{resilience:.0f}%", f"-{100-resilience:.0f}%",
+                  help=f"{confidence}: [{res_lo:.0f}%, {res_hi:.0f}%]")
     
     # === EXPORT ===
     export_data = {
         "trauma_type": trauma_type,
         "intensity": trauma_intensity,
+        "fidelity": fidelity,
         "scar_strength": float(scar_strength),
+        "scar_strength_ci": [scar_lo, scar_hi],
+        "resilience": resilience,
+        "resilience_ci": [res_lo, res_hi],
+        "replicas": ensemble['replicas'],
         "memory_matrix": final_memory.tolist()
     }
     
@@ -260,6 +204,13 @@ if st.sidebar.button("🔥 RUN SIMULATION", type="primary"):
         file_name=f"anamnesis_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
         mime="application/json"
     )
+    
+    st.download_button(
+        "🎞️ Download Trajectory (.anam)",
+        data=trajectory_bytes,
+        file_name=f"anamnesis_{datetime.now().strftime('%Y%m%d_%H%M')}.anam",
+        mime="application/octet-stream"
+    )
 
 # === FOOTER ===
 st.markdown("---")
@@ -270,3 +221,12 @@ st.markdown("""
 - **Social Sims**: Characters with realistic PTSD responses
 
 ### 📚 Cite This Work
+```
+@software{corbin2026anamnesis,
+  author = {Corbin, Marc-Olivier},
+  title = {ANAMNESIS: Topological Memory Engine for NPCs},
+  year = {2026},
+  url = {https://github.com/MOC-G3C/Project-Anamnesis}
+}
+```
+""")
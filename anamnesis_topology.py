@@ -0,0 +1,122 @@
+import numpy as np
+
+# --- TOPOLOGIE DES CICATRICES ---
+# Un lien existe entre i et j quand la mémoire partagée (celle de la passe
+# de forces : (M[i,j] + M[j,i]) / 2) dépasse un seuil. Pour chaque seuil,
+# on maintient composantes connexes, cliques et agents isolés de façon
+# incrémentale :
+#   - ajout de lien   -> union-find (union par taille, compression de chemin)
+#   - retrait de lien -> parcours local depuis i ; si j n'est plus
+#     atteignable, seule la composante touchée est scindée et ré-étiquetée.
+# Aucune reconstruction globale du graphe à chaque tick.
+
+class BondGraph:
+    """Graphe des liens au-dessus d'un seuil, tenu à jour lien par lien."""
+    def __init__(self, num_agents):
+        self.adj = [set() for _ in range(num_agents)]
+        self.parent = list(range(num_agents))
+        self.members = {i: {i} for i in range(num_agents)}
+        self.edges = {i: 0 for i in range(num_agents)}
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root: root = self.parent[root]
+        while self.parent[i] != root: self.parent[i], i = root, self.parent[i]
+        return root
+
+    def is_clique(self, root):
+        k = len(self.members[root])
+        return k >= 3 and self.edges[root] == k * (k - 1) // 2
+
+    def add(self, i, j):
+        events = [('connected', (a,)) for a in (i, j) if not self.adj[a]]
+        self.adj[i].add(j); self.adj[j].add(i)
+        ri, rj = self.find(i), self.find(j)
+        if ri == rj:
+            was_clique = self.is_clique(ri)
+            self.edges[ri] += 1
+        else:
+            was_clique = False
+            if len(self.members[ri]) < len(self.members[rj]): ri, rj = rj, ri
+            events.append(('merge', (sorted(self.members[ri]), sorted(self.members[rj]))))
+            if self.is_clique(ri): events.append(('clique_broken', tuple(sorted(self.members[ri]))))
+            if self.is_clique(rj): events.append(('clique_broken', tuple(sorted(self.members[rj]))))
+            self.parent[rj] = ri
+            self.members[ri] |= self.members.pop(rj)
+            self.edges[ri] += self.edges.pop(rj) + 1
+        if self.is_clique(ri) and not was_clique:
+            events.append(('clique_formed', tuple(sorted(self.members[ri]))))
+        return events
+
+    def remove(self, i, j):
+        events = []
+        root = self.find(i)
+        was_clique = self.is_clique(root)
+        self.adj[i].discard(j); self.adj[j].discard(i)
+        self.edges[root] -= 1
+        if was_clique: events.append(('clique_broken', tuple(sorted(self.members[root]))))
+
+        # Parcours local : j est-il encore atteignable depuis i ?
+        seen, frontier = {i}, [i]
+        while frontier and j not in seen:
+            node = frontier.pop()
+            for other in self.adj[node]:
+                if other not in seen: seen.add(other); frontier.append(other)
+
+        if j not in seen:
+            rest = self.members.pop(root) - seen
+            self.edges.pop(root)
+            for side, new_root in ((seen, i), (rest, j)):
+                for node in side: self.parent[node] = new_root
+                self.members[new_root] = side
+                self.edges[new_root] = sum(len(self.adj[node]) for node in side) // 2
+            events.append(('split', (sorted(seen), sorted(rest))))
+            for side_root in (i, j):
+                if self.is_clique(side_root): events.append(('clique_formed', tuple(sorted(self.members[side_root]))))
+
+        events += [('isolated', (a,)) for a in (i, j) if not self.adj[a]]
+        return events
+
+    def components(self):
+        return sorted(sorted(m) for m in self.members.values())
+
+    def cliques(self):
+        return sorted(sorted(self.members[r]) for r in self.members if self.is_clique(r))
+
+    def isolated(self):
+        return [i for i, nbrs in enumerate(self.adj) if not nbrs]
+
+class ScarTopology:
+    """
+    Suit la topologie sociale à plusieurs seuils. update(memory) compare
+    les liens au tick précédent et ne traite que ceux qui ont franchi un
+    seuil ; renvoie la liste des événements de topologie.
+    """
+    def __init__(self, num_agents, thresholds=(0.5, 2.0)):
+        self.thresholds = tuple(thresholds)
+        self.levels = {t: BondGraph(num_agents) for t in self.thresholds}
+        self._bonded = {t: np.zeros((num_agents, num_agents), dtype=bool) for t in self.thresholds}
+        self._upper = np.triu(np.ones((num_agents, num_agents), dtype=bool), 1)
+
+    def update(self, memory, frame=None):
+        shared_memory = (memory + memory.T) / 2.0
+        events = []
+        for threshold, graph in self.levels.items():
+            bonded = (shared_memory > threshold) & self._upper
+            previous = self._bonded[threshold]
+            # Retraits d'abord : une scission suivie d'un ajout reste visible
+            for i, j in np.argwhere(previous & ~bonded):
+                events += [dict(frame=frame, level=threshold, event=e, agents=a) for e, a in graph.remove(int(i), int(j))]
+            for i, j in np.argwhere(bonded & ~previous):
+                events += [dict(frame=frame, level=threshold, event=e, agents=a) for e, a in graph.add(int(i), int(j))]
+            self._bonded[threshold] = bonded
+        return events
+
+    def components(self, threshold):
+        return self.levels[threshold].components()
+
+    def cliques(self, threshold):
+        return self.levels[threshold].cliques()
+
+    def isolated(self, threshold):
+        return self.levels[threshold].isolated()
@@ -2,8 +2,10 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from matplotlib.gridspec import GridSpec
+import anamnesis_core as core
 
-# [Gardez votre code existant jusqu'à la section GRAPHIQUE]
+# Moteur partagé : l'état vit dans anamnesis_core, ce module ne fait que le rendu
+from anamnesis_core import PARAMS, num_agents, colors, diversity_history
 
 # --- GRAPHIQUE AMÉLIORÉ ---
 plt.style.use('dark_background')
@@ -37,9 +39,8 @@ state_history = [np.zeros(num_agents)]
 memory_total_history = [0]
 
 def update(f):
-    global positions, velocities, states, memory_matrix
-    
-    # [Votre logique existante...]
+    core.simulate(f)
+    positions, states, memory_matrix = core.positions, core.states, core.memory_matrix
     
     # Métriques supplémentaires
     state_history.append(states.copy())
@@ -119,6 +120,7 @@ def update(f):
                 transform=ax_3d.transAxes, ha='center', 
                 fontsize=14, color='white', weight='bold')
 
-ani = FuncAnimation(fig, update, frames=PARAMS['steps'], 
-                   interval=20, blit=False)
-plt.show()
+if __name__ == "__main__":
+    ani = FuncAnimation(fig, update, frames=PARAMS['steps'], 
+                       interval=20, blit=False)
+    plt.show()
@@ -1,6 +1,5 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 import json
 from datetime import datetime
 
@@ -22,6 +21,8 @@ intensity = st.sidebar.slider("Trauma Intensity", 1, 10, 5)
 
 # === SIMULATION (Version TRES Simplifiée) ===
 if st.sidebar.button("🔥 Simulate Trauma", type="primary"):
+    import matplotlib.pyplot as plt # Chargé au premier rendu seulement
+    
     
     # Simulation simplifiée
     agents = ["Warrior", "Diplomat", "Scout", "Leader"]
@@ -123,8 +124,7 @@ if st.sidebar.button("🔥 Simulate Trauma", type="primary"):
         - Occasionally have trust breakdowns (random negative events)
         """)
         # Dans la section "Game Design Implication", ajoute :
-
-st.markdown("""
+        st.markdown("""
 **Example In-Game Dialogue:**
 
 *Turn 1 (Before Trauma):*